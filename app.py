@@ -1,30 +1,165 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash
+from flask import Flask, Response, abort, g, has_app_context, has_request_context, render_template, request, jsonify, session, redirect, url_for, flash, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from flask_socketio import SocketIO, emit, join_room
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from functools import wraps
-from sqlalchemy import text
+from collections import OrderedDict, namedtuple
+from sqlalchemy import Select, create_engine, event, inspect, text, func, false, insert, select, update, case, union_all, or_, and_, literal_column
+from sqlalchemy.orm import Session as OrmSession, joinedload, object_session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from array import array
+import atexit
+import io
 import os
+import csv
+import re
+import json
+import shutil
+import tempfile
+import base64
+import binascii
+import math
+import queue
+import threading
+import time
+import click
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch_distances falls back to the array module
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; only needed for Parquet exports
+    pa = pq = None
+
+def normalize_database_url(url):
+    """Accept the legacy postgres:// scheme that SQLAlchemy no longer recognises"""
+    if url and url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
-app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///ecotrack.db')
+app.config['SQLALCHEMY_DATABASE_URI'] = normalize_database_url(os.environ.get('DATABASE_URL', 'sqlite:///ecotrack.db'))
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Applied to every new SQLite connection: WAL lets readers run alongside the single
+# writer, and busy_timeout makes writers wait for the lock instead of failing
+app.config['SQLITE_PRAGMAS'] = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    'cache_size': -64000,  # negative means KiB, so 64 MB
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+def database_engine_options(uri):
+    """Connection pool settings for the configured backend"""
+    if uri.startswith('sqlite'):
+        if uri in ('sqlite://', 'sqlite:///:memory:'):
+            return {}  # Flask-SQLAlchemy gives in-memory databases a single shared connection
+        # SQLite allows one writer at a time, so a large pool only adds lock waiters
+        return {
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+            'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        }
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+    }
+
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = database_engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+
+# Optional read replica serving the SELECTs of routes marked @read_replica
+app.config['DATABASE_REPLICA_URL'] = normalize_database_url(os.environ.get('DATABASE_REPLICA_URL'))
+# After a user's own write, their reads stay on the primary this long so replication lag can't hide it
+app.config['REPLICA_STICKY_SECONDS'] = float(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+if app.config['DATABASE_REPLICA_URL']:
+    app.config['SQLALCHEMY_BINDS'] = {'replica': {
+        'url': app.config['DATABASE_REPLICA_URL'],
+        **database_engine_options(app.config['DATABASE_REPLICA_URL'])
+    }}
+
+class RoutingSession(FlaskSQLAlchemySession):
+    """Session that sends plain SELECTs to the replica during @read_replica requests.
+    
+    Flushes and INSERT/UPDATE/DELETE statements always go to the primary. Once
+    a session has written (see _mark_primary_write), its later reads stay on
+    the primary too.
+    """
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if isinstance(clause, UpdateBase):
+                self.info['wrote_primary'] = True
+            elif (isinstance(clause, Select) and not self.info.get('wrote_primary')
+                  and has_app_context() and g.get('use_replica')):
+                return db.engines['replica']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
 # Initialize extensions
-db = SQLAlchemy(app)
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 login_manager.login_message = 'Please log in to access this page.'
 socketio = SocketIO(app, cors_allowed_origins="*", manage_session=False)
 
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in app.config['SQLITE_PRAGMAS'].items():
+        cursor.execute(f'PRAGMA {name}={value}')
+    cursor.close()
+
+with app.app_context():
+    for engine in db.engines.values():
+        if engine.dialect.name == 'sqlite':
+            event.listen(engine, 'connect', apply_sqlite_pragmas)
+
+@event.listens_for(OrmSession, 'after_commit')
+def _remember_primary_write(orm_session):
+    # Recorded in the user's Flask session so their next requests read from the primary;
+    # without a replica there's nothing to stick to, so leave the cookie alone
+    if orm_session.info.pop('wrote_primary', False) and has_request_context() and replica_configured():
+        session['last_write_at'] = time.time()
+
+@event.listens_for(OrmSession, 'before_flush')
+def _mark_primary_write(orm_session, flush_context, instances):
+    # Only dispatched when the session has pending changes, i.e. the flush writes
+    orm_session.info['wrote_primary'] = True
+
+@event.listens_for(OrmSession, 'after_rollback')
+def _discard_primary_write(orm_session):
+    orm_session.info.pop('wrote_primary', None)
+
 # Note: Using OpenStreetMap Nominatim for geocoding (no API key required)
+app.config['GEOCODER_URL'] = os.environ.get('GEOCODER_URL', 'https://nominatim.openstreetmap.org/search')
+
+# Chat exchanges are stored in the background by default; 'sync' commits each one before replying
+app.config['CHAT_PERSISTENCE_MODE'] = os.environ.get('CHAT_PERSISTENCE_MODE', 'write-behind')
+app.config['CHAT_WRITE_BATCH_SIZE'] = int(os.environ.get('CHAT_WRITE_BATCH_SIZE', 100))
+app.config['CHAT_WRITE_INTERVAL'] = float(os.environ.get('CHAT_WRITE_INTERVAL', 1.0))
 
 # Database Models
 class User(UserMixin, db.Model):
+    __table_args__ = (
+        db.Index('ix_user_created_at', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -57,6 +192,14 @@ class User(UserMixin, db.Model):
     achievements = db.relationship('Achievement', backref='user', lazy=True)
 
 class WasteEntry(db.Model):
+    __table_args__ = (
+        db.Index('ix_waste_entry_user_status_date', 'user_id', 'status', 'disposal_date'),
+        db.Index('ix_waste_entry_user_date', 'user_id', 'disposal_date'),
+        db.Index('ix_waste_entry_status_date', 'status', 'disposal_date'),
+        db.Index('ix_waste_entry_type_date', 'waste_type', 'disposal_date'),
+        db.Index('ix_waste_entry_disposal_date', 'disposal_date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     waste_type = db.Column(db.String(50), nullable=False)  # organic, recyclable, hazardous, other
@@ -77,6 +220,10 @@ class WasteEntry(db.Model):
     )
 
 class RecyclingCenter(db.Model):
+    __table_args__ = (
+        db.Index('ix_recycling_center_active_lat_lng', 'is_active', 'latitude', 'longitude'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     address = db.Column(db.String(255), nullable=False)
@@ -112,6 +259,10 @@ class ChatMessage(db.Model):
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
 class WasteGoal(db.Model):
+    __table_args__ = (
+        db.Index('ix_waste_goal_user_created', 'user_id', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     goal_type = db.Column(db.String(50), nullable=False)  # reduce, recycle, track
@@ -124,6 +275,11 @@ class WasteGoal(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Notification(db.Model):
+    __table_args__ = (
+        db.Index('ix_notification_user_read_created', 'user_id', 'is_read', 'created_at'),
+        db.Index('ix_notification_user_created', 'user_id', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     title = db.Column(db.String(200), nullable=False)
@@ -134,6 +290,10 @@ class Notification(db.Model):
     link = db.Column(db.String(255))  # Optional link to related page
 
 class Achievement(db.Model):
+    __table_args__ = (
+        db.Index('ix_achievement_user_type', 'user_id', 'achievement_type'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     achievement_type = db.Column(db.String(100), nullable=False)
@@ -141,9 +301,137 @@ class Achievement(db.Model):
     description = db.Column(db.Text)
     unlocked_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+class GeocodeCache(db.Model):
+    """Geocoding results keyed by normalised address (NULL coordinates = not found)"""
+    id = db.Column(db.Integer, primary_key=True)
+    address_key = db.Column(db.String(500), unique=True, nullable=False)
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    provider = db.Column(db.String(50))
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class UserWasteCounter(db.Model):
+    """Running per-user totals, kept in step with WasteEntry writes"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    entry_count = db.Column(db.Integer, nullable=False, default=0)
+    total_weight = db.Column(db.Float, nullable=False, default=0.0)
+    recycled_count = db.Column(db.Integer, nullable=False, default=0)
+    recycled_weight = db.Column(db.Float, nullable=False, default=0.0)
+
+class UserWasteRollup(db.Model):
+    """Pre-aggregated waste totals per user bucket, kept in step with WasteEntry writes"""
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'waste_type', 'month', 'week', 'status', 'recycled',
+                            name='uq_user_waste_rollup_bucket'),
+        # Covering indexes for the dashboard totals, so they never touch the table rows
+        db.Index('ix_user_waste_rollup_status_counts', 'status', 'recycled', 'entry_count'),
+        db.Index('ix_user_waste_rollup_user_status_counts', 'user_id', 'status', 'recycled', 'entry_count'),
+        db.Index('ix_user_waste_rollup_type_totals', 'waste_type', 'entry_count', 'total_weight'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    waste_type = db.Column(db.String(50), nullable=False)
+    month = db.Column(db.String(7), nullable=False)  # YYYY-MM
+    week = db.Column(db.String(10), nullable=False)  # YYYY-MM-DD of the Monday starting the week
+    status = db.Column(db.String(20), nullable=False)  # new, waiting, disposed
+    recycled = db.Column(db.Boolean, nullable=False, default=False)
+    entry_count = db.Column(db.Integer, nullable=False, default=0)
+    total_weight = db.Column(db.Float, nullable=False, default=0.0)
+
+class SchemaVersion(db.Model):
+    """One row per applied schema migration (see MIGRATIONS)"""
+    __tablename__ = 'schema_version'
+
+    version = db.Column(db.Integer, primary_key=True)
+    description = db.Column(db.String(200), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# User loader cache
+USER_CACHE_SIZE = 10000
+USER_CACHE_TTL = 60  # seconds
+
+class UserSnapshot(UserMixin):
+    """Detached, read-only copy of the User columns requests read from current_user"""
+    FIELDS = ('id', 'username', 'email', 'address', 'city', 'latitude', 'longitude', 'is_admin', 'created_at')
+    
+    def __init__(self, user):
+        for field in self.FIELDS:
+            setattr(self, field, getattr(user, field))
+
+class UserSnapshotCache:
+    """Bounded LRU of UserSnapshots with a TTL, shared by all request threads"""
+    
+    def __init__(self, maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # user_id -> (expires_at, snapshot)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(user_id)
+            if cached and cached[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+        return None
+    
+    def put(self, user_id, snapshot):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+    
+    def metrics(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+user_cache = UserSnapshotCache()
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _mark_user_changed(mapper, connection, target):
+    object_session(target).info.setdefault('users_changed', set()).add(target.id)
+
+@event.listens_for(OrmSession, 'after_commit')
+def _invalidate_changed_users(session):
+    user_ids = session.info.pop('users_changed', None)
+    if user_ids:
+        user_cache.invalidate(user_ids)
+
+@event.listens_for(OrmSession, 'after_rollback')
+def _discard_user_changes(session):
+    session.info.pop('users_changed', None)
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    user_id = int(user_id)
+    snapshot = user_cache.get(user_id)
+    if snapshot is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = UserSnapshot(user)
+        user_cache.put(user_id, snapshot)
+    return snapshot
 
 # Admin decorator - only allows admins
 def admin_required(f):
@@ -167,6 +455,24 @@ def user_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# Read replica decorator - routes the request's SELECTs to the replica when one is configured
+def read_replica(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.use_replica = replica_allowed()
+        return f(*args, **kwargs)
+    return decorated_function
+
+def replica_configured():
+    return 'replica' in app.config.get('SQLALCHEMY_BINDS', {})
+
+def replica_allowed():
+    """Whether this request may read from the replica (read-only method, no recent write by this user)"""
+    if not replica_configured() or request.method not in ('GET', 'HEAD'):
+        return False
+    last_write_at = session.get('last_write_at')
+    return last_write_at is None or time.time() - last_write_at > app.config['REPLICA_STICKY_SECONDS']
+
 # Routes
 @app.route('/')
 def index():
@@ -191,23 +497,20 @@ def register():
             flash('Email already registered', 'error')
             return render_template('register.html')
         
-        # Geocode address if provided
-        lat, lng = None, None
-        if address:
-            lat, lng = geocode_address(f"{address}, {city}, Nepal")
-        
         user = User(
             username=username,
             email=email,
             password_hash=generate_password_hash(password),
             address=address,
-            city=city,
-            latitude=lat,
-            longitude=lng
+            city=city
         )
         db.session.add(user)
         db.session.commit()
         
+        # Geocode address in the background if provided
+        if address:
+            geocoding_worker.enqueue(user.id, f"{address}, {city}, Nepal")
+        
         flash('Registration successful! Please log in.', 'success')
         return redirect(url_for('login'))
     
@@ -253,22 +556,16 @@ def dashboard():
     recent_entries = WasteEntry.query.filter_by(user_id=current_user.id)\
         .order_by(WasteEntry.disposal_date.desc()).limit(5).all()
     
-    # Get statistics
-    total_entries = WasteEntry.query.filter_by(user_id=current_user.id).count()
-    recycled_count = WasteEntry.query.filter_by(user_id=current_user.id, recycled=True).count()
-    
-    # Get waste status counts for tracking
-    new_count = WasteEntry.query.filter_by(user_id=current_user.id, status='new').count()
-    waiting_count = WasteEntry.query.filter_by(user_id=current_user.id, status='waiting').count()
-    disposed_count = WasteEntry.query.filter_by(user_id=current_user.id, status='disposed').count()
+    # Get statistics and waste status counts for tracking
+    counters = waste_status_counters(current_user.id)
     
     return render_template('dashboard.html', 
                          recent_entries=recent_entries,
-                         total_entries=total_entries,
-                         recycled_count=recycled_count,
-                         new_count=new_count,
-                         waiting_count=waiting_count,
-                         disposed_count=disposed_count,
+                         total_entries=counters['total'],
+                         recycled_count=counters['recycled'],
+                         new_count=counters['new'],
+                         waiting_count=counters['waiting'],
+                         disposed_count=counters['disposed'],
                          )
 
 @app.route('/track-waste', methods=['GET', 'POST'])
@@ -276,7 +573,11 @@ def dashboard():
 def track_waste():
     if request.method == 'POST':
         waste_type = request.form.get('waste_type')
-        weight_kg = request.form.get('weight_kg', type=float)
+        try:
+            weight_kg = parse_weight_kg(request.form.get('weight_kg') or None)
+        except ValueError as e:
+            flash(str(e), 'error')
+            return redirect(url_for('track_waste'))
         description = request.form.get('description', '')
         recycled = bool(request.form.get('recycled'))
         
@@ -293,29 +594,28 @@ def track_waste():
             status='new'  # New entries start with 'new' status
         )
         db.session.add(entry)
+        db.session.flush()
+        # Updates statistics, counters, achievements and goals
+        record_waste_changes([(None, waste_entry_state(entry))])
         db.session.commit()
         
-        # Check for achievements
-        check_and_create_achievements(current_user.id)
-        
-        # Update goals progress
-        update_goals_progress(current_user.id)
-        
         flash('Waste entry added successfully!', 'success')
         return redirect(url_for('track_waste'))
     
-    # Get entries grouped by status
-    new_entries = WasteEntry.query.filter_by(user_id=current_user.id, status='new')\
-        .order_by(WasteEntry.disposal_date.desc()).all()
-    waiting_entries = WasteEntry.query.filter_by(user_id=current_user.id, status='waiting')\
-        .order_by(WasteEntry.disposal_date.desc()).all()
-    disposed_entries = WasteEntry.query.filter_by(user_id=current_user.id, status='disposed')\
-        .order_by(WasteEntry.disposal_date.desc()).all()
+    # Get the first page of entries for each status; the page loads more on demand
+    pages = {}
+    for status in WASTE_STATUSES:
+        query = user_waste_entries_query(current_user.id, status)
+        pages[status] = keyset_page(query, WasteEntry.disposal_date, WasteEntry.id, TRACK_WASTE_PAGE_SIZE)
+    counters = waste_status_counters(current_user.id)
     
     return render_template('track_waste.html', 
-                         new_entries=new_entries,
-                         waiting_entries=waiting_entries,
-                         disposed_entries=disposed_entries)
+                         new_entries=pages['new'][0],
+                         waiting_entries=pages['waiting'][0],
+                         disposed_entries=pages['disposed'][0],
+                         next_cursors={status: page[1] for status, page in pages.items()},
+                         status_counts=counters,
+                         page_size=TRACK_WASTE_PAGE_SIZE)
 
 @app.route('/toggle-recycled/<int:entry_id>', methods=['POST'])
 @user_required
@@ -328,14 +628,28 @@ def toggle_recycled(entry_id):
         flash('Unauthorized action', 'error')
         return redirect(url_for('track_waste'))
     
-    entry.recycled = not entry.recycled
-    db.session.commit()
+    # Conditioned on the value read above and the delta taken from the row actually
+    # updated, so two concurrent toggles can't apply the same rollup change twice
+    recycled = bool(entry.recycled)
+    row = db.session.execute(
+        update(WasteEntry)
+        .where(WasteEntry.id == entry.id, func.coalesce(WasteEntry.recycled, False) == recycled)
+        .values(recycled=not recycled)
+        .returning(WasteEntry.user_id, WasteEntry.waste_type, WasteEntry.disposal_date,
+                   WasteEntry.status, WasteEntry.weight_kg),
+        execution_options={'synchronize_session': False}
+    ).one_or_none()
+    if row is None:
+        db.session.rollback()
+        flash('This entry was changed by another request, please try again', 'error')
+        return redirect(url_for('track_waste'))
     
-    # Update goals and achievements
-    check_and_create_achievements(current_user.id)
-    update_goals_progress(current_user.id)
+    before = WasteEntryState(user_id=row.user_id, waste_type=row.waste_type, disposal_date=row.disposal_date,
+                             status=row.status or 'new', recycled=recycled, weight_kg=row.weight_kg or 0)
+    record_waste_changes([(before, before._replace(recycled=not recycled))])
+    db.session.commit()
     
-    flash(f'Entry marked as {"recycled" if entry.recycled else "not recycled"}', 'success')
+    flash(f'Entry marked as {"recycled" if not recycled else "not recycled"}', 'success')
     return redirect(url_for('track_waste'))
 
 @app.route('/recycling-centers')
@@ -344,11 +658,11 @@ def recycling_centers():
     centers = RecyclingCenter.query.filter_by(is_active=True).all()
     
     # If user has location, sort by distance
-    if current_user.latitude and current_user.longitude:
-        centers = sorted(centers, key=lambda c: calculate_distance(
-            current_user.latitude, current_user.longitude,
-            c.latitude, c.longitude
-        ))
+    if current_user.latitude and current_user.longitude and centers:
+        distances = batch_distances(current_user.latitude, current_user.longitude,
+                                    [c.latitude for c in centers], [c.longitude for c in centers])
+        order = sorted(range(len(centers)), key=distances.__getitem__)
+        centers = [centers[i] for i in order]
     
     return render_template('recycling_centers.html', 
                          centers=centers,
@@ -400,121 +714,37 @@ def waste_tips():
 
 @app.route('/statistics')
 @user_required
+@read_replica
 def statistics():
     """Detailed statistics page with charts"""
-    # Get all user's waste entries
-    entries = WasteEntry.query.filter_by(user_id=current_user.id).all()
-    
-    # Calculate statistics
-    total_entries = len(entries)
-    total_weight = sum(e.weight_kg or 0 for e in entries)
-    recycled_count = sum(1 for e in entries if e.recycled)
-    recycled_weight = sum(e.weight_kg or 0 for e in entries if e.recycled)
-    
-    # Group by waste type
-    waste_by_type = {}
-    for entry in entries:
-        waste_type = entry.waste_type
-        if waste_type not in waste_by_type:
-            waste_by_type[waste_type] = {'count': 0, 'weight': 0}
-        waste_by_type[waste_type]['count'] += 1
-        waste_by_type[waste_type]['weight'] += entry.weight_kg or 0
-    
-    # Monthly statistics
-    monthly_stats = {}
-    for entry in entries:
-        month_key = entry.disposal_date.strftime('%Y-%m')
-        if month_key not in monthly_stats:
-            monthly_stats[month_key] = {'count': 0, 'weight': 0}
-        monthly_stats[month_key]['count'] += 1
-        monthly_stats[month_key]['weight'] += entry.weight_kg or 0
-    
-    # Weekly statistics (group by week starting Monday)
-    from datetime import timedelta
-    weekly_stats = {}
-    for entry in entries:
-        # Get the start of the week (Monday)
-        entry_date = entry.disposal_date
-        days_since_monday = entry_date.weekday()
-        week_start = entry_date - timedelta(days=days_since_monday)
-        week_key = week_start.strftime('%Y-%m-%d')
-        
-        if week_key not in weekly_stats:
-            weekly_stats[week_key] = {'count': 0, 'weight': 0}
-        weekly_stats[week_key]['count'] += 1
-        weekly_stats[week_key]['weight'] += entry.weight_kg or 0
-    
-    # Status distribution statistics
-    status_distribution = {
-        'new': 0,
-        'waiting': 0,
-        'disposed': 0,
-        'new_weight': 0,
-        'waiting_weight': 0,
-        'disposed_weight': 0
-    }
-    for entry in entries:
-        status = entry.status or 'new'
-        weight = entry.weight_kg or 0
-        if status in ['new', 'waiting', 'disposed']:
-            status_distribution[status] += 1
-            status_distribution[f'{status}_weight'] += weight
-    
-    # Environmental impact (rough estimates)
-    # Calculate CO2 saved based on waste type
-    co2_saved = 0
-    trees_saved = 0
-    
-    for entry in entries:
-        if entry.recycled and entry.weight_kg:
-            weight = entry.weight_kg
-            # Different waste types have different CO2 savings
-            if entry.waste_type == 'recyclable':
-                # Recyclable: 1 kg ≈ 0.6 kg CO2 saved
-                co2_saved += weight * 0.6
-                # Paper/plastic recycling saves trees
-                trees_saved += (weight / 1000) * 17
-            elif entry.waste_type == 'organic':
-                # Organic waste composting: 1 kg ≈ 0.3 kg CO2 saved
-                co2_saved += weight * 0.3
-            elif entry.waste_type == 'hazardous':
-                # Proper hazardous waste disposal: 1 kg ≈ 0.8 kg CO2 saved
-                co2_saved += weight * 0.8
-            else:
-                # Other waste: 1 kg ≈ 0.4 kg CO2 saved
-                co2_saved += weight * 0.4
+    summary = summarize_waste_rollups(load_waste_rollups(current_user.id))
     
-    # Also calculate potential savings from recyclable waste (even if not marked recycled)
-    # This gives users an idea of what they could save
-    recyclable_entries = [e for e in entries if e.waste_type == 'recyclable' and not e.recycled and e.weight_kg]
-    potential_co2 = sum(e.weight_kg * 0.6 for e in recyclable_entries)
-    potential_trees = sum((e.weight_kg / 1000) * 17 for e in recyclable_entries)
+    total_entries = summary['total_entries']
+    recycled_count = summary['recycled_count']
     
     # Calculate recycling rate
     recycling_rate = (recycled_count / total_entries * 100) if total_entries > 0 else 0
     
     return render_template('statistics.html',
                          total_entries=total_entries,
-                         total_weight=round(total_weight, 2),
+                         total_weight=round(summary['total_weight'], 2),
                          recycled_count=recycled_count,
-                         recycled_weight=round(recycled_weight, 2),
-                         waste_by_type=waste_by_type,
-                         monthly_stats=monthly_stats,
-                         weekly_stats=weekly_stats,
-                         status_distribution=status_distribution,
-                         co2_saved=round(co2_saved, 2),
-                         trees_saved=round(trees_saved, 2),
+                         recycled_weight=round(summary['recycled_weight'], 2),
+                         waste_by_type=summary['waste_by_type'],
+                         monthly_stats=summary['monthly_stats'],
+                         weekly_stats=summary['weekly_stats'],
+                         status_distribution=summary['status_distribution'],
+                         co2_saved=round(summary['co2_saved'], 2),
+                         trees_saved=round(summary['trees_saved'], 2),
                          recycling_rate=round(recycling_rate, 1),
-                         potential_co2=round(potential_co2, 2),
-                         potential_trees=round(potential_trees, 2))
+                         potential_co2=round(summary['potential_co2'], 2),
+                         potential_trees=round(summary['potential_trees'], 2),
+                         parquet_available=pa is not None)
 
 @app.route('/goals')
 @user_required
 def goals():
     """Waste reduction goals page"""
-    # Update all goals progress before displaying
-    update_goals_progress(current_user.id)
-    
     user_goals = WasteGoal.query.filter_by(user_id=current_user.id).order_by(WasteGoal.created_at.desc()).all()
     return render_template('goals.html', goals=user_goals)
 
@@ -545,6 +775,8 @@ def create_goal():
         start_date=None  # Count all entries by default, not just from creation date
     )
     db.session.add(goal)
+    db.session.flush()
+    refresh_goal(goal)
     db.session.commit()
     
     flash('Goal created successfully!', 'success')
@@ -573,31 +805,18 @@ def mark_notification_read(notification_id):
 
 @app.route('/export-data')
 @user_required
+@read_replica
 def export_data():
-    """Export user data as CSV"""
-    import csv
-    from io import StringIO
-    
-    entries = WasteEntry.query.filter_by(user_id=current_user.id).all()
-    
-    output = StringIO()
-    writer = csv.writer(output)
-    writer.writerow(['Date', 'Waste Type', 'Weight (kg)', 'Description', 'Recycled'])
-    
-    for entry in entries:
-        writer.writerow([
-            entry.disposal_date.strftime('%Y-%m-%d'),
-            entry.waste_type,
-            entry.weight_kg or '',
-            entry.description or '',
-            'Yes' if entry.recycled else 'No'
-        ])
-    
-    from flask import Response
-    return Response(
-        output.getvalue(),
-        mimetype='text/csv',
-        headers={'Content-Disposition': f'attachment; filename=ecotrack_data_{current_user.username}_{datetime.now().strftime("%Y%m%d")}.csv'}
+    """Export user data as CSV, NDJSON or Parquet (?format=), streamed in batches"""
+    export_format = request.args.get('format', 'csv')
+    error = export_format_error(export_format)
+    if error:
+        flash(error, 'error')
+        return redirect(url_for('statistics'))
+    
+    return export_response(
+        export_format, EXPORT_FIELDS, export_batches(current_user.id),
+        f'ecotrack_data_{current_user.username}_{datetime.now().strftime("%Y%m%d")}'
     )
 
 @app.route('/calculator')
@@ -609,34 +828,26 @@ def calculator():
 # Admin Routes
 @app.route('/admin')
 @admin_required
+@read_replica
 def admin_dashboard():
     """Admin dashboard with overview statistics"""
     # Get all waste entries grouped by status
-    new_waste = WasteEntry.query.filter_by(status='new').count()
-    waiting_waste = WasteEntry.query.filter_by(status='waiting').count()
-    disposed_waste = WasteEntry.query.filter_by(status='disposed').count()
-    total_waste = WasteEntry.query.count()
+    counters = waste_status_counters()
     
     # Get recent waste entries (prioritize new entries, then waiting, then disposed)
-    recent_entries_new = WasteEntry.query.filter_by(status='new').order_by(WasteEntry.disposal_date.desc()).limit(5).all()
-    recent_entries_waiting = WasteEntry.query.filter_by(status='waiting').order_by(WasteEntry.disposal_date.desc()).limit(3).all()
-    recent_entries_disposed = WasteEntry.query.filter_by(status='disposed').order_by(WasteEntry.disposal_date.desc()).limit(2).all()
-    recent_entries = list(recent_entries_new) + list(recent_entries_waiting) + list(recent_entries_disposed)
+    recent_entries = recent_entries_by_status(ADMIN_RECENT_ENTRIES)
     
     # Get statistics by waste type
-    waste_by_type = {}
-    for entry in WasteEntry.query.all():
-        waste_type = entry.waste_type
-        if waste_type not in waste_by_type:
-            waste_by_type[waste_type] = {'count': 0, 'weight': 0}
-        waste_by_type[waste_type]['count'] += 1
-        waste_by_type[waste_type]['weight'] += entry.weight_kg or 0
+    waste_by_type = {
+        waste_type: {'count': count, 'weight': weight}
+        for waste_type, count, weight in waste_totals_by_type_query().all()
+    }
     
     return render_template('admin/dashboard.html',
-                         new_waste=new_waste,
-                         waiting_waste=waiting_waste,
-                         disposed_waste=disposed_waste,
-                         total_waste=total_waste,
+                         new_waste=counters['new'],
+                         waiting_waste=counters['waiting'],
+                         disposed_waste=counters['disposed'],
+                         total_waste=counters['total'],
                          recent_entries=recent_entries,
                          waste_by_type=waste_by_type)
 
@@ -648,20 +859,22 @@ def admin_waste_management():
     status_filter = request.args.get('status', 'all')
     waste_type_filter = request.args.get('waste_type', 'all')
     
-    # Build query
-    query = WasteEntry.query
-    
-    if status_filter != 'all':
-        query = query.filter_by(status=status_filter)
+    query = admin_waste_entries_query(status_filter, waste_type_filter)
     
-    if waste_type_filter != 'all':
-        query = query.filter_by(waste_type=waste_type_filter)
-    
-    # Order by disposal date (newest first)
-    entries = query.order_by(WasteEntry.disposal_date.desc()).all()
+    # Order by disposal date (newest first), one page at a time
+    after = request.args.get('after')
+    try:
+        entries, next_cursor = keyset_page(query, WasteEntry.disposal_date, WasteEntry.id,
+                                           ADMIN_PAGE_SIZE, after)
+    except ValueError:
+        flash('Invalid page cursor', 'error')
+        return redirect(url_for('admin_waste_management', status=status_filter, waste_type=waste_type_filter))
     
     return render_template('admin/waste_management.html',
                          entries=entries,
+                         next_cursor=next_cursor,
+                         is_first_page=not after,
+                         total_estimate=estimate_waste_entry_count(status_filter, waste_type_filter),
                          current_status=status_filter,
                          current_waste_type=waste_type_filter)
 
@@ -669,40 +882,88 @@ def admin_waste_management():
 @admin_required
 def admin_update_waste_status(entry_id):
     """Admin endpoint to update waste entry status"""
-    entry = WasteEntry.query.get_or_404(entry_id)
     new_status = request.form.get('status')
     
-    if new_status not in ['new', 'waiting', 'disposed']:
+    if new_status not in WASTE_STATUSES:
         flash('Invalid status', 'error')
         return redirect(url_for('admin_waste_management'))
     
-    # Update status
-    entry.status = new_status
-    entry.status_updated_at = datetime.utcnow()
-    entry.status_updated_by = current_user.id
-    
-    db.session.commit()
-    
-    # Create notification for the user
-    notification = Notification(
-        user_id=entry.user_id,
-        title='Waste Status Updated',
-        message=f'Your waste entry (ID: {entry_id}) status has been updated to {new_status.title()} by admin.',
-        notification_type='info',
-        link='/track-waste'
-    )
-    db.session.add(notification)
-    db.session.commit()
+    outcomes = transition_waste_statuses([entry_id], new_status, current_user.id)
+    if outcomes[entry_id] == 'not_found':
+        abort(404)
     
     flash(f'Waste entry #{entry_id} status updated to {new_status.title()}', 'success')
     return redirect(url_for('admin_waste_management'))
 
+@app.route('/admin/waste-status/bulk', methods=['POST'])
+@admin_required
+def admin_bulk_update_waste_status():
+    """Move many waste entries to one status; JSON bodies get per-id outcomes back"""
+    if request.is_json:
+        data = request.get_json(silent=True) or {}
+        entry_ids = data.get('entry_ids')
+        new_status = data.get('status')
+        if not isinstance(entry_ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in entry_ids):
+            return jsonify({'error': 'entry_ids must be a list of integers'}), 400
+    else:
+        try:
+            entry_ids = [int(i) for i in request.form.getlist('entry_ids')]
+        except ValueError:
+            flash('Invalid entry selection', 'error')
+            return redirect(url_for('admin_waste_management'))
+        new_status = request.form.get('status')
+    
+    if new_status not in WASTE_STATUSES:
+        if request.is_json:
+            return jsonify({'error': f"status must be one of: {', '.join(WASTE_STATUSES)}"}), 400
+        flash('Invalid status', 'error')
+        return redirect(url_for('admin_waste_management'))
+    if len(entry_ids) > BULK_MAX_ENTRIES:
+        if request.is_json:
+            return jsonify({'error': f'At most {BULK_MAX_ENTRIES} entries per request'}), 413
+        flash(f'Select at most {BULK_MAX_ENTRIES} entries at a time', 'error')
+        return redirect(url_for('admin_waste_management'))
+    
+    outcomes = transition_waste_statuses(entry_ids, new_status, current_user.id)
+    counts = {outcome: 0 for outcome in ('updated', 'unchanged', 'not_found')}
+    for outcome in outcomes.values():
+        counts[outcome] += 1
+    
+    if request.is_json:
+        return jsonify({**counts, 'results': [{'id': entry_id, 'status': outcome}
+                                              for entry_id, outcome in outcomes.items()]})
+    
+    if not entry_ids:
+        flash('No waste entries selected', 'error')
+    else:
+        flash(f"{counts['updated']} waste entries updated to {new_status.title()}"
+              f" ({counts['unchanged']} unchanged, {counts['not_found']} not found)", 'success')
+    return redirect(url_for('admin_waste_management',
+                            status=request.form.get('current_status', 'all'),
+                            waste_type=request.form.get('current_waste_type', 'all')))
+
 @app.route('/admin/users')
 @admin_required
+@read_replica
 def admin_users():
     """Admin page to view all users"""
-    users = User.query.order_by(User.created_at.desc()).all()
-    return render_template('admin/users.html', users=users)
+    search = request.args.get('q', '').strip()
+    
+    query, count_query = admin_users_query(search)
+    
+    after = request.args.get('after')
+    try:
+        users, next_cursor = keyset_page(query, User.created_at, User.id, ADMIN_PAGE_SIZE, after)
+    except ValueError:
+        flash('Invalid page cursor', 'error')
+        return redirect(url_for('admin_users', q=search))
+    
+    return render_template('admin/users.html',
+                         users=users,
+                         total_users=count_query.scalar(),
+                         search=search,
+                         next_cursor=next_cursor,
+                         is_first_page=not after)
 
 @app.route('/admin/make-admin/<int:user_id>', methods=['POST'])
 @admin_required
@@ -714,6 +975,31 @@ def make_admin(user_id):
     flash(f'User {user.username} has been promoted to admin', 'success')
     return redirect(url_for('admin_users'))
 
+@app.route('/admin/export-data')
+@admin_required
+@read_replica
+def admin_export_data():
+    """Export every user's waste entries (?format=csv|ndjson|parquet), streamed in batches"""
+    export_format = request.args.get('format', 'csv')
+    error = export_format_error(export_format)
+    if error:
+        flash(error, 'error')
+        return redirect(url_for('admin_dashboard'))
+    
+    return export_response(
+        export_format, ADMIN_EXPORT_FIELDS, export_batches(),
+        f'ecotrack_all_data_{datetime.now().strftime("%Y%m%d")}'
+    )
+
+@app.route('/admin/metrics')
+@admin_required
+def admin_metrics():
+    """Admin endpoint exposing in-process runtime metrics"""
+    return jsonify({
+        'http_clients': {name: client.metrics() for name, client in http_clients.items()},
+        'user_cache': user_cache.metrics()
+    })
+
 @app.route('/setup-admin', methods=['GET', 'POST'])
 def setup_admin():
     """Helper route to create first admin user (only works if no admins exist)"""
@@ -757,37 +1043,97 @@ def setup_admin():
 # API Routes
 @app.route('/api/waste-entries', methods=['GET', 'POST'])
 @user_required
+@read_replica
 def api_waste_entries():
     if request.method == 'GET':
-        entries = WasteEntry.query.filter_by(user_id=current_user.id).all()
-        return jsonify([{
-            'id': e.id,
-            'waste_type': e.waste_type,
-            'weight_kg': e.weight_kg,
-            'description': e.description,
-            'disposal_date': e.disposal_date.isoformat(),
-            'recycled': e.recycled
-        } for e in entries])
+        limit = min(max(request.args.get('limit', API_PAGE_SIZE, type=int), 1), API_MAX_PAGE_SIZE)
+        query = user_waste_entries_query(current_user.id, request.args.get('status'))
+        
+        try:
+            entries, next_cursor = keyset_page(query, WasteEntry.disposal_date, WasteEntry.id,
+                                               limit, request.args.get('after'))
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        return jsonify({
+            'entries': [{
+                'id': e.id,
+                'waste_type': e.waste_type,
+                'weight_kg': e.weight_kg,
+                'description': e.description,
+                'disposal_date': e.disposal_date.isoformat(),
+                'recycled': e.recycled,
+                'status': e.status,
+                'status_updated_at': e.status_updated_at.isoformat() if e.status_updated_at else None,
+                'status_updated_by': e.status_updater.username if e.status_updater else None
+            } for e in entries],
+            'next_cursor': next_cursor
+        })
     
     elif request.method == 'POST':
-        data = request.json
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
+        try:
+            weight_kg = parse_weight_kg(data.get('weight_kg'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         entry = WasteEntry(
             user_id=current_user.id,
             waste_type=data.get('waste_type'),
-            weight_kg=data.get('weight_kg'),
+            weight_kg=weight_kg,
             description=data.get('description', '')
         )
         db.session.add(entry)
+        db.session.flush()
+        record_waste_changes([(None, waste_entry_state(entry))])
         db.session.commit()
         return jsonify({'id': entry.id, 'message': 'Entry created successfully'}), 201
 
+@app.route('/api/waste-entries/bulk', methods=['POST'])
+@user_required
+def api_waste_entries_bulk():
+    """Create many waste entries at once from a JSON array or an NDJSON body"""
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        items = []
+        for line in request.get_data(as_text=True).splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                items.append(BulkItemError(f'Invalid JSON: {e}'))
+    else:
+        items = request.get_json(silent=True)
+        if not isinstance(items, list):
+            return jsonify({'error': 'Expected a JSON array of entries or an NDJSON body'}), 400
+    
+    if len(items) > BULK_MAX_ENTRIES:
+        return jsonify({'error': f'At most {BULK_MAX_ENTRIES} entries per request'}), 413
+    
+    results = ingest_waste_entries(current_user.id, items)
+    created = sum(1 for r in results if r['status'] == 'created')
+    failed = len(results) - created
+    status_code = 201 if not failed else (207 if created else 400)
+    return jsonify({'created': created, 'failed': failed, 'results': results}), status_code
+
 @app.route('/api/recycling-centers', methods=['GET'])
 @user_required
+@read_replica
 def api_recycling_centers():
     lat = request.args.get('lat', type=float)
     lng = request.args.get('lng', type=float)
+    nearest = request.args.get('nearest', type=int)
     
-    if lat and lng:
+    if lat is not None and not -90 <= lat <= 90:
+        return jsonify({'error': 'lat must be between -90 and 90'}), 400
+    if lng is not None and not -180 <= lng <= 180:
+        return jsonify({'error': 'lng must be between -180 and 180'}), 400
+    
+    if lat and lng and nearest:
+        centers = get_nearest_recycling_centers(lat, lng, min(max(nearest, 1), NEAREST_CENTERS_MAX))
+    elif lat and lng:
         centers = get_nearby_recycling_centers(lat, lng)
     else:
         centers = RecyclingCenter.query.filter_by(is_active=True).all()
@@ -806,6 +1152,7 @@ def api_recycling_centers():
 
 @app.route('/api/pickup-schedules', methods=['GET'])
 @user_required
+@read_replica
 def api_pickup_schedules():
     area = request.args.get('area')
     schedules = PickupSchedule.query.filter_by(is_active=True)
@@ -825,33 +1172,22 @@ def api_pickup_schedules():
 
 @app.route('/api/statistics', methods=['GET'])
 @user_required
+@read_replica
 def api_statistics():
     """API endpoint for statistics data"""
-    entries = WasteEntry.query.filter_by(user_id=current_user.id).all()
-    
-    total_entries = len(entries)
-    total_weight = sum(e.weight_kg or 0 for e in entries)
-    recycled_count = sum(1 for e in entries if e.recycled)
-    recycled_weight = sum(e.weight_kg or 0 for e in entries if e.recycled)
-    
-    waste_by_type = {}
-    for entry in entries:
-        waste_type = entry.waste_type
-        if waste_type not in waste_by_type:
-            waste_by_type[waste_type] = {'count': 0, 'weight': 0}
-        waste_by_type[waste_type]['count'] += 1
-        waste_by_type[waste_type]['weight'] += entry.weight_kg or 0
+    summary = summarize_waste_rollups(load_waste_rollups(current_user.id))
     
     return jsonify({
-        'total_entries': total_entries,
-        'total_weight': round(total_weight, 2),
-        'recycled_count': recycled_count,
-        'recycled_weight': round(recycled_weight, 2),
-        'waste_by_type': waste_by_type
+        'total_entries': summary['total_entries'],
+        'total_weight': round(summary['total_weight'], 2),
+        'recycled_count': summary['recycled_count'],
+        'recycled_weight': round(summary['recycled_weight'], 2),
+        'waste_by_type': summary['waste_by_type']
     })
 
 @app.route('/api/goals', methods=['GET', 'POST'])
 @user_required
+@read_replica
 def api_goals():
     """API endpoint for goals"""
     if request.method == 'GET':
@@ -876,51 +1212,27 @@ def api_goals():
             end_date=datetime.fromisoformat(data['end_date']) if data.get('end_date') else None
         )
         db.session.add(goal)
+        db.session.flush()  # Apply column defaults (start_date) before computing progress
+        refresh_goal(goal)
         db.session.commit()
         return jsonify({'id': goal.id, 'message': 'Goal created'}), 201
 
 @app.route('/api/notifications', methods=['GET'])
 @user_required
+@read_replica
 def api_notifications():
     """API endpoint for notifications"""
     notifications = Notification.query.filter_by(user_id=current_user.id, is_read=False)\
         .order_by(Notification.created_at.desc()).limit(10).all()
-    return jsonify([{
-        'id': n.id,
-        'title': n.title,
-        'message': n.message,
-        'type': n.notification_type,
-        'created_at': n.created_at.isoformat(),
-        'link': n.link
-    } for n in notifications])
+    return jsonify([notification_payload(n) for n in notifications])
 
 # Socket.IO Events
 @socketio.on('connect')
 def handle_connect(auth):
-    """Handle client connection - check if user is authenticated"""
-    from flask import request as flask_request
-    # Get user from session cookie
-    user_id = None
-    try:
-        with app.app_context():
-            from flask_login import current_user
-            if hasattr(flask_request, 'cookies'):
-                # Try to get user from session
-                session_id = flask_request.cookies.get('session')
-                if session_id:
-                    # Decode session to get user_id
-                    from itsdangerous import URLSafeTimedSerializer
-                    serializer = URLSafeTimedSerializer(app.secret_key)
-                    try:
-                        session_data = serializer.loads(session_id)
-                        user_id = session_data.get('user_id') or session_data.get('_user_id')
-                    except:
-                        pass
-    except Exception as e:
-        print(f"Session error: {e}")
-    
-    if user_id:
-        join_room(f'user_{user_id}')
+    """Handle client connection - authenticate once from the Flask-Login session"""
+    if current_user.is_authenticated:
+        socket_sessions.register(request.sid, current_user.id)
+        join_room(f'user_{current_user.id}')
         emit('connected', {'message': 'Connected to Ecotrack chat'})
     else:
         # Allow connection but require auth for messages
@@ -929,37 +1241,13 @@ def handle_connect(auth):
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
-    pass
+    socket_sessions.evict(request.sid)
 
 @socketio.on('chat_message')
 def handle_chat_message(data):
     """Handle chat messages from client"""
-    from flask import request as flask_request
-    
-    # Try to get user_id from session
-    user_id = None
-    try:
-        # Flask-SocketIO should preserve the session
-        # Try to get from request context
-        with app.app_context():
-            from flask_login import current_user
-            # Access session through request
-            if hasattr(flask_request, 'cookies'):
-                # Try to decode session
-                try:
-                    from itsdangerous import URLSafeTimedSerializer
-                    serializer = URLSafeTimedSerializer(app.secret_key)
-                    session_cookie = flask_request.cookies.get('session')
-                    if session_cookie:
-                        session_data = serializer.loads(session_cookie)
-                        user_id = session_data.get('_user_id') or session_data.get('user_id')
-                except:
-                    # Fallback: try to get from data
-                    user_id = data.get('user_id')
-    except Exception as e:
-        print(f"Error getting user_id: {e}")
-        user_id = data.get('user_id')
-    
+    # The user was authenticated when this connection was made
+    user_id = socket_sessions.lookup(request.sid)
     if not user_id:
         emit('error', {'message': 'Please refresh the page and log in again.'})
         return
@@ -971,29 +1259,323 @@ def handle_chat_message(data):
     # Enhanced chatbot responses
     response = generate_chatbot_response(message, user_id)
     
-    # Save to database
-    try:
-        chat_msg = ChatMessage(
-            user_id=user_id,
-            message=message,
-            response=response
-        )
-        db.session.add(chat_msg)
-        db.session.commit()
-    except Exception as e:
-        print(f"Error saving chat message: {e}")
-    
     emit('chat_response', {
         'message': message,
         'response': response,
         'timestamp': datetime.utcnow().isoformat()
     })
+    
+    # Stored after replying; in write-behind mode the row lands with the next batch
+    chat_writer.record(user_id, message, response)
 
-# Helper Functions
-def geocode_address(address):
-    """Geocode an address using OpenStreetMap Nominatim API"""
-    try:
-        url = "https://nominatim.openstreetmap.org/search"
+# Socket.IO session registry
+class SocketSessionRegistry:
+    """Maps Socket.IO connection ids to the user authenticated at connect time"""
+    
+    def __init__(self):
+        self._users = {}
+        self._lock = threading.Lock()
+    
+    def register(self, sid, user_id):
+        with self._lock:
+            self._users[sid] = user_id
+    
+    def lookup(self, sid):
+        return self._users.get(sid)
+    
+    def evict(self, sid):
+        with self._lock:
+            self._users.pop(sid, None)
+    
+    def __len__(self):
+        return len(self._users)
+
+socket_sessions = SocketSessionRegistry()
+
+# Chat persistence
+class ChatMessageWriter:
+    """Write-behind queue that stores chat exchanges in batched group commits.
+    
+    In 'write-behind' mode rows are queued and a background task inserts them
+    once CHAT_WRITE_BATCH_SIZE rows are waiting or CHAT_WRITE_INTERVAL seconds
+    have passed. The queue is bounded: when it is full the caller waits up to
+    CHAT_WRITE_BLOCK_TIMEOUT and then writes its row itself, so a stalled
+    database slows chat down instead of dropping messages. In 'sync' mode every
+    row is committed before record() returns.
+    """
+    
+    _STOP = object()  # queued by close() so the worker flushes its batch and exits
+    
+    def __init__(self, mode='write-behind', maxsize=10000, batch_size=100, interval=1.0, block_timeout=2.0):
+        self.mode = mode
+        self.batch_size = batch_size
+        self.interval = interval
+        self.block_timeout = block_timeout
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+    
+    def record(self, user_id, message, response):
+        """Persist one chat exchange according to the configured mode"""
+        row = {'user_id': user_id, 'message': message, 'response': response, 'timestamp': datetime.utcnow()}
+        if self.mode == 'sync' or self._stopping:
+            self._write([row])
+            return
+        
+        self._ensure_started()
+        try:
+            self._queue.put(row, timeout=self.block_timeout)
+        except queue.Full:
+            print("Chat persistence queue full, writing message synchronously")
+            self._write([row])
+    
+    def close(self, timeout=10):
+        """Stop the worker, letting it flush the batch it holds, then write anything still queued"""
+        self._stopping = True
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            try:
+                self._queue.put(self._STOP, timeout=timeout)
+                thread.join(timeout)
+            except queue.Full:
+                print("Chat persistence worker did not drain in time")
+        
+        batch = []
+        while True:
+            try:
+                row = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if row is not self._STOP:
+                batch.append(row)
+        if batch:
+            with app.app_context():
+                self._write(batch)
+    
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = socketio.start_background_task(self._run)
+    
+    def _run(self):
+        stopping = False
+        while not stopping:
+            row = self._queue.get()
+            if row is self._STOP:
+                break
+            batch = [row]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    row = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if row is self._STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+            with app.app_context():
+                self._write(batch)
+    
+    def _write(self, rows):
+        try:
+            db.session.execute(insert(ChatMessage), rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error saving {len(rows)} chat message(s): {e}")
+
+chat_writer = ChatMessageWriter(
+    mode=app.config['CHAT_PERSISTENCE_MODE'],
+    batch_size=app.config['CHAT_WRITE_BATCH_SIZE'],
+    interval=app.config['CHAT_WRITE_INTERVAL']
+)
+atexit.register(chat_writer.close)
+
+# Outbound HTTP
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit breaker is open"""
+
+class RateLimitedError(Exception):
+    """Raised when no rate-limit token became available in time"""
+
+class TokenBucket:
+    """Thread-safe token bucket allowing ``rate`` calls per second with bursts up to ``capacity``"""
+    
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, timeout=None):
+        """Take a token, waiting up to ``timeout`` seconds (forever if None); False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+class CircuitBreaker:
+    """Fails fast after ``failure_threshold`` consecutive errors.
+    
+    Once open, calls are rejected until ``reset_timeout`` seconds pass; then
+    a single trial call is let through (half-open) and its outcome closes
+    or re-opens the circuit.
+    """
+    
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+    
+    def is_open(self):
+        """True while calls are being rejected outright (doesn't start a trial)"""
+        with self._lock:
+            return self.state == 'open' and time.monotonic() - self._opened_at < self.reset_timeout
+    
+    def allow(self):
+        """Whether to make a call; every allowed call must then record its outcome"""
+        with self._lock:
+            if self.state == 'open':
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = 'half-open'
+                return True
+            # Only one trial call at a time while half-open
+            return self.state == 'closed'
+    
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self._failures = 0
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == 'half-open' or self._failures >= self.failure_threshold:
+                self.state = 'open'
+                self._opened_at = time.monotonic()
+
+class OutboundHTTPClient:
+    """Keep-alive requests session with rate limiting, a circuit breaker and call metrics"""
+    
+    def __init__(self, name, rate_per_second=1.0, burst=1, rate_limit_wait=10,
+                 failure_threshold=5, reset_timeout=30, pool_size=10, timeout=5):
+        self.name = name
+        self.timeout = timeout
+        self.rate_limit_wait = rate_limit_wait
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.rate_limiter = TokenBucket(rate_per_second, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            'requests': 0,
+            'failures': 0,
+            'rejected_open_circuit': 0,
+            'rate_limited': 0,
+            'total_latency_ms': 0.0,
+            'max_latency_ms': 0.0,
+        }
+        http_clients[name] = self
+    
+    def _count(self, metric, amount=1):
+        with self._metrics_lock:
+            self._metrics[metric] += amount
+    
+    def get(self, url, **kwargs):
+        """GET a URL; raises CircuitOpenError, RateLimitedError or requests exceptions"""
+        # Fail fast without queueing for a token while the circuit is open
+        if self.breaker.is_open():
+            self._count('rejected_open_circuit')
+            raise CircuitOpenError(f'{self.name} circuit is open')
+        if not self.rate_limiter.acquire(timeout=self.rate_limit_wait):
+            self._count('rate_limited')
+            raise RateLimitedError(f'{self.name} rate limit wait exceeded')
+        if not self.breaker.allow():
+            self._count('rejected_open_circuit')
+            raise CircuitOpenError(f'{self.name} circuit is open')
+        
+        kwargs.setdefault('timeout', self.timeout)
+        start = time.perf_counter()
+        succeeded = False
+        try:
+            response = self.session.get(url, **kwargs)
+            # Server errors count against the breaker; 4xx are the caller's problem
+            if response.status_code >= 500:
+                response.raise_for_status()
+            succeeded = True
+            return response
+        except requests.RequestException:
+            self._count('failures')
+            raise
+        finally:
+            # Always report the outcome, or a half-open trial would never finish
+            if succeeded:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            latency_ms = (time.perf_counter() - start) * 1000
+            with self._metrics_lock:
+                self._metrics['requests'] += 1
+                self._metrics['total_latency_ms'] += latency_ms
+                self._metrics['max_latency_ms'] = max(self._metrics['max_latency_ms'], latency_ms)
+    
+    def metrics(self):
+        with self._metrics_lock:
+            snapshot = dict(self._metrics)
+        snapshot['avg_latency_ms'] = round(snapshot['total_latency_ms'] / snapshot['requests'], 2) if snapshot['requests'] else 0
+        snapshot['circuit_state'] = self.breaker.state
+        return snapshot
+
+# Every OutboundHTTPClient registers itself here so its metrics can be reported
+http_clients = {}
+
+# Geocoding
+class GeocodingProvider:
+    """Interface for address geocoders.
+    
+    geocode() returns (lat, lng), or (None, None) when the address isn't
+    found, and raises on transport/service errors so failures aren't cached.
+    """
+    name = 'base'
+    
+    def geocode(self, address):
+        raise NotImplementedError
+
+class NominatimProvider(GeocodingProvider):
+    """OpenStreetMap Nominatim search API (or any server speaking the same protocol)"""
+    name = 'nominatim'
+    
+    def __init__(self, url, client=None):
+        self.url = url
+        # Nominatim's usage policy allows at most 1 request per second
+        self.client = client or OutboundHTTPClient('nominatim', rate_per_second=1.0)
+    
+    def geocode(self, address):
         params = {
             'q': address,
             'format': 'json',
@@ -1002,193 +1584,202 @@ def geocode_address(address):
         headers = {
             'User-Agent': 'Ecotrack Waste Management App'  # Required by Nominatim
         }
-        response = requests.get(url, params=params, headers=headers, timeout=5)
+        response = self.client.get(self.url, params=params, headers=headers)
+        response.raise_for_status()
         data = response.json()
         
         if data and len(data) > 0:
             location = data[0]
             return float(location['lat']), float(location['lon'])
+        return None, None
+
+geocoding_provider = NominatimProvider(app.config['GEOCODER_URL'])
+
+def set_geocoding_provider(provider):
+    """Swap the active geocoder, e.g. for a local stand-in server in tests"""
+    global geocoding_provider
+    geocoding_provider = provider
+
+def normalize_address(address):
+    """Cache key for an address: lowercase words with punctuation and extra spaces removed"""
+    return ' '.join(re.sub(r'[^\w\s]', ' ', address.lower()).split())
+
+GEOCODE_MISS_TTL = timedelta(days=1)  # how long "not found" is trusted before asking again
+
+def geocode_address(address):
+    """Geocode an address, consulting the persistent cache before the provider"""
+    address_key = normalize_address(address)
+    cached = GeocodeCache.query.filter_by(address_key=address_key).first()
+    if cached is not None and (cached.latitude is not None
+                               or cached.updated_at > datetime.utcnow() - GEOCODE_MISS_TTL):
+        return cached.latitude, cached.longitude
+    
+    try:
+        lat, lng = geocoding_provider.geocode(address)
     except Exception as e:
         print(f"Geocoding error: {e}")
+        return None, None
     
-    return None, None
+    # Cache misses too, for a while, so unknown addresses don't hit the provider on every lookup
+    try:
+        if cached is None:
+            db.session.add(GeocodeCache(address_key=address_key, latitude=lat, longitude=lng,
+                                        provider=geocoding_provider.name))
+        else:
+            cached.latitude, cached.longitude = lat, lng
+            cached.provider = geocoding_provider.name
+            cached.updated_at = datetime.utcnow()
+        db.session.commit()
+    except Exception:
+        # Another worker cached the same address first
+        db.session.rollback()
+    return lat, lng
 
-def calculate_distance(lat1, lng1, lat2, lng2):
-    """Calculate distance between two coordinates using Haversine formula"""
-    from math import radians, sin, cos, sqrt, atan2
-    
-    R = 6371  # Earth radius in km
+class GeocodingWorker:
+    """Background queue that fills in User.latitude/longitude after registration"""
     
-    lat1_rad = radians(lat1)
-    lat2_rad = radians(lat2)
-    delta_lat = radians(lat2 - lat1)
-    delta_lng = radians(lng2 - lng1)
+    def __init__(self, maxsize=1000):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._started = False
     
-    a = sin(delta_lat/2)**2 + cos(lat1_rad) * cos(lat2_rad) * sin(delta_lng/2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1-a))
-    
-    return R * c
+    def enqueue(self, user_id, address):
+        """Schedule a user's address for geocoding; never blocks the request"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((user_id, address))
+        except queue.Full:
+            print(f"Geocoding queue full, skipping user {user_id}")
+    
+    def _ensure_started(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        socketio.start_background_task(self._run)
+    
+    def _run(self):
+        while True:
+            user_id, address = self._queue.get()
+            try:
+                with app.app_context():
+                    lat, lng = geocode_address(address)
+                    if lat is not None and lng is not None:
+                        User.query.filter_by(id=user_id).update({'latitude': lat, 'longitude': lng})
+                        db.session.commit()
+                        # Bulk updates skip the mapper events that normally invalidate this
+                        user_cache.invalidate([user_id])
+            except Exception as e:
+                print(f"Geocoding worker error for user {user_id}: {e}")
+            finally:
+                self._queue.task_done()
 
-def get_nearby_recycling_centers(lat, lng, radius_km=10, limit=10):
-    """Get recycling centers within radius"""
-    centers = RecyclingCenter.query.filter_by(is_active=True).all()
+geocoding_worker = GeocodingWorker()
+
+# Helper Functions
+EARTH_RADIUS_KM = 6371
+
+def calculate_distance(lat1, lng1, lat2, lng2):
+    """Calculate distance between two coordinates using Haversine formula"""
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    delta_lat = math.radians(lat2 - lat1)
+    delta_lng = math.radians(lng2 - lng1)
     
-    nearby = []
-    for center in centers:
-        distance = calculate_distance(lat, lng, center.latitude, center.longitude)
-        if distance <= radius_km:
-            nearby.append((distance, center))
-    
-    # Sort by distance and limit
-    nearby.sort(key=lambda x: x[0])
-    return [center for _, center in nearby[:limit]]
-
-def check_and_create_achievements(user_id):
-    """Check if user has unlocked any achievements"""
-    entries = WasteEntry.query.filter_by(user_id=user_id).all()
-    total_entries = len(entries)
-    recycled_count = sum(1 for e in entries if e.recycled)
-    total_weight = sum(e.weight_kg or 0 for e in entries if e.recycled)
-    
-    achievements_to_check = [
-        (1, 'First Step', 'Tracked your first waste entry!', 'first_entry'),
-        (5, 'Getting Started', 'Tracked 5 waste entries!', 'five_entries'),
-        (10, 'Waste Warrior', 'Tracked 10 waste entries!', 'ten_entries'),
-        (25, 'Eco Champion', 'Tracked 25 waste entries!', 'twenty_five_entries'),
-        (1, 'Recycler', 'Recycled your first item!', 'first_recycle'),
-        (10, 'Recycling Master', 'Recycled 10 items!', 'ten_recycles'),
-        (50, 'Eco Hero', 'Recycled 50 kg of waste!', 'fifty_kg_recycled')
-    ]
-    
-    for threshold, title, description, achievement_type in achievements_to_check:
-        # Check if achievement already exists
-        existing = Achievement.query.filter_by(
-            user_id=user_id,
-            achievement_type=achievement_type
-        ).first()
-        
-        if existing:
-            continue
-        
-        # Check conditions
-        unlocked = False
-        if achievement_type == 'first_entry' and total_entries >= 1:
-            unlocked = True
-        elif achievement_type == 'five_entries' and total_entries >= 5:
-            unlocked = True
-        elif achievement_type == 'ten_entries' and total_entries >= 10:
-            unlocked = True
-        elif achievement_type == 'twenty_five_entries' and total_entries >= 25:
-            unlocked = True
-        elif achievement_type == 'first_recycle' and recycled_count >= 1:
-            unlocked = True
-        elif achievement_type == 'ten_recycles' and recycled_count >= 10:
-            unlocked = True
-        elif achievement_type == 'fifty_kg_recycled' and total_weight >= 50:
-            unlocked = True
-        
-        if unlocked:
-            achievement = Achievement(
-                user_id=user_id,
-                achievement_type=achievement_type,
-                title=title,
-                description=description
-            )
-            db.session.add(achievement)
-            
-            # Create notification
-            notification = Notification(
-                user_id=user_id,
-                title='🏆 Achievement Unlocked!',
-                message=f'{title}: {description}',
-                notification_type='achievement',
-                link='/dashboard'
-            )
-            db.session.add(notification)
+    a = math.sin(delta_lat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lng/2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
     
-    db.session.commit()
+    return EARTH_RADIUS_KM * c
 
-def update_goals_progress(user_id):
-    """Update progress for user's waste reduction goals"""
-    # Update ALL goals (both completed and not completed) to show accurate progress
-    goals = WasteGoal.query.filter_by(user_id=user_id).all()
-    entries = WasteEntry.query.filter_by(user_id=user_id).all()
-    
-    for goal in goals:
-        was_completed = goal.is_completed
-        
-        if goal.goal_type == 'reduce':
-            # Calculate total waste in current period
-            # If start_date is set, count from that date; otherwise count all entries
-            if goal.start_date:
-                period_entries = [e for e in entries if e.disposal_date >= goal.start_date]
-            else:
-                period_entries = entries
-            
-            if goal.end_date:
-                period_entries = [e for e in period_entries if e.disposal_date <= goal.end_date]
-            
-            current_value = sum(e.weight_kg or 0 for e in period_entries)
-            goal.current_value = current_value
-            
-            # Check if goal is completed (reduced waste)
-            if current_value <= goal.target_value and not was_completed:
-                goal.is_completed = True
-                create_notification(user_id, 'Goal Achieved!', 
-                                 f'You achieved your goal to reduce waste to {goal.target_value} {goal.unit}!',
-                                 'achievement', '/goals')
-            elif current_value > goal.target_value and was_completed:
-                # Goal was completed but now exceeded - mark as not completed
-                goal.is_completed = False
+def batch_distances(lat, lng, lats, lngs):
+    """Haversine distances in km from one origin to many points, computed in one pass.
+    
+    Uses NumPy when installed and returns an ndarray; otherwise returns an
+    ``array('d')``. Both index and iterate like a list.
+    """
+    if np is not None:
+        lats_rad = np.radians(np.asarray(lats, dtype=float))
+        delta_lat = lats_rad - math.radians(lat)
+        delta_lng = np.radians(np.asarray(lngs, dtype=float) - lng)
+        a = np.sin(delta_lat / 2) ** 2 + math.cos(math.radians(lat)) * np.cos(lats_rad) * np.sin(delta_lng / 2) ** 2
+        # 2·atan2(√a, √(1−a)) == 2·asin(√a); clip guards against rounding just above 1
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+    
+    # Pure-Python fallback with the origin terms and math functions hoisted out of the loop
+    radians, sin, cos, asin, sqrt = math.radians, math.sin, math.cos, math.asin, math.sqrt
+    lat_rad = radians(lat)
+    cos_lat = cos(lat_rad)
+    diameter = 2 * EARTH_RADIUS_KM
+    distances = array('d')
+    append = distances.append
+    for point_lat, point_lng in zip(lats, lngs):
+        point_lat_rad = radians(point_lat)
+        a = sin((point_lat_rad - lat_rad) / 2) ** 2 + cos_lat * cos(point_lat_rad) * sin(radians(point_lng - lng) / 2) ** 2
+        append(diameter * asin(sqrt(min(a, 1.0))))
+    return distances
+
+def measure_centers(lat, lng, centers):
+    """Pair each (center_id, lat, lng) with its distance: [(distance_km, center_id)]"""
+    if not centers:
+        return []
+    center_ids, lats, lngs = zip(*centers)
+    return list(zip(batch_distances(lat, lng, lats, lngs), center_ids))
+
+@app.cli.command('bench-distance')
+@click.option('--repeat', default=3, help='Timing runs per size (best is reported)')
+def bench_distance_command(repeat):
+    """Compare scalar calculate_distance against batch_distances at 1k, 10k and 100k centers"""
+    import random
+    
+    rng = random.Random(42)
+    origin = (27.7172, 85.3240)  # Kathmandu
+    click.echo(f"batch kernel: {'numpy' if np is not None else 'array module'}")
+    click.echo(f"{'centers':>8}  {'scalar ms':>10}  {'batch ms':>10}  {'speedup':>8}")
+    
+    for size in (1_000, 10_000, 100_000):
+        lats = [rng.uniform(26.3, 30.4) for _ in range(size)]
+        lngs = [rng.uniform(80.0, 88.2) for _ in range(size)]
         
-        elif goal.goal_type == 'recycle':
-            # Count recycled items
-            # If start_date is set, count from that date; otherwise count all entries
-            recycled_entries = [e for e in entries if e.recycled]
-            
-            if goal.start_date:
-                recycled_entries = [e for e in recycled_entries if e.disposal_date >= goal.start_date]
-            
-            if goal.end_date:
-                recycled_entries = [e for e in recycled_entries if e.disposal_date <= goal.end_date]
-            
-            if goal.unit == 'count':
-                current_value = len(recycled_entries)
-            else:
-                current_value = sum(e.weight_kg or 0 for e in recycled_entries)
-            
-            goal.current_value = current_value
-            
-            if current_value >= goal.target_value and not was_completed:
-                goal.is_completed = True
-                create_notification(user_id, 'Goal Achieved!',
-                                 f'You achieved your recycling goal of {goal.target_value} {goal.unit}!',
-                                 'achievement', '/goals')
+        def best_of(fn):
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fn()
+                timings.append(time.perf_counter() - start)
+            return min(timings) * 1000
         
-        elif goal.goal_type == 'track':
-            # Count total entries
-            # If start_date is set, count from that date; otherwise count all entries
-            if goal.start_date:
-                period_entries = [e for e in entries if e.disposal_date >= goal.start_date]
-            else:
-                period_entries = entries
-            
-            if goal.end_date:
-                period_entries = [e for e in period_entries if e.disposal_date <= goal.end_date]
-            
-            current_value = len(period_entries)
-            goal.current_value = current_value
-            
-            if current_value >= goal.target_value and not was_completed:
-                goal.is_completed = True
-                create_notification(user_id, 'Goal Achieved!',
-                                 f'You tracked {goal.target_value} waste entries!',
-                                 'achievement', '/goals')
+        scalar_ms = best_of(lambda: [calculate_distance(origin[0], origin[1], la, ln) for la, ln in zip(lats, lngs)])
+        batch_ms = best_of(lambda: batch_distances(origin[0], origin[1], lats, lngs))
+        click.echo(f"{size:>8}  {scalar_ms:>10.2f}  {batch_ms:>10.2f}  {scalar_ms / batch_ms:>7.1f}x")
+
+NEAREST_CENTERS_MAX = 50
+
+def get_nearby_recycling_centers(lat, lng, radius_km=10, limit=10):
+    """Get recycling centers within radius"""
+    nearby = recycling_center_index.within_radius(lat, lng, radius_km)
+    if nearby is None:
+        # Index is cold: answer from the database and build it for later requests
+        nearby = nearby_centers_from_database(lat, lng, radius_km)
+        recycling_center_index.warm_in_background()
     
-    db.session.commit()
+    return load_centers_in_order([center_id for _, center_id in nearby[:limit]])
 
-def create_notification(user_id, title, message, notification_type='info', link=None):
-    """Helper function to create notifications"""
+def get_nearest_recycling_centers(lat, lng, k=5):
+    """The k closest active recycling centers, nearest first, however far away"""
+    nearest = recycling_center_index.nearest(lat, lng, k)
+    if nearest is None:
+        rows = db.session.query(RecyclingCenter.id, RecyclingCenter.latitude, RecyclingCenter.longitude)\
+            .filter(RecyclingCenter.is_active == True).all()
+        nearest = sorted(measure_centers(lat, lng, rows))[:k]
+        recycling_center_index.warm_in_background()
+    return load_centers_in_order([center_id for _, center_id in nearest])
+
+def load_centers_in_order(center_ids):
+    centers = {c.id: c for c in RecyclingCenter.query.filter(RecyclingCenter.id.in_(center_ids))}
+    return [centers[center_id] for center_id in center_ids if center_id in centers]
+
+def create_notification(user_id, title, message, notification_type='info', link=None, commit=True):
+    """Helper function to create notifications (pass commit=False to join the caller's transaction)"""
     notification = Notification(
         user_id=user_id,
         title=title,
@@ -1197,130 +1788,1597 @@ def create_notification(user_id, title, message, notification_type='info', link=
         link=link
     )
     db.session.add(notification)
-    db.session.commit()
+    if commit:
+        db.session.commit()
     return notification
 
-def generate_chatbot_response(message, user_id=None):
-    """Generate enhanced chatbot response based on user message"""
-    message_lower = message.lower()
+def notification_payload(notification):
+    """JSON shape of a notification, shared by the API and Socket.IO pushes"""
+    return {
+        'id': notification.id,
+        'title': notification.title,
+        'message': notification.message,
+        'type': notification.notification_type,
+        'created_at': notification.created_at.isoformat(),
+        'link': notification.link
+    }
+
+# Notifications are pushed to the owner's Socket.IO room once their transaction commits
+@event.listens_for(Notification, 'after_insert')
+def _queue_notification_push(mapper, connection, target):
+    object_session(target).info.setdefault('pending_notifications', []).append(
+        (target.user_id, notification_payload(target))
+    )
+
+@event.listens_for(OrmSession, 'after_commit')
+def _push_committed_notifications(session):
+    for user_id, payload in session.info.pop('pending_notifications', []):
+        publish_notification(user_id, payload)
+
+@event.listens_for(OrmSession, 'after_rollback')
+def _discard_pending_notifications(session):
+    session.info.pop('pending_notifications', None)
+
+def publish_notification(user_id, payload):
+    """Deliver a notification payload to every open tab of a user"""
+    try:
+        socketio.emit('notification', payload, to=f'user_{user_id}')
+    except Exception as e:
+        print(f"Notification push error: {e}")
+
+# SQL aggregation
+# Dialect-specific expressions bucketing a datetime column into the same
+# 'YYYY-MM' month and 'YYYY-MM-DD' (Monday) week keys used by rollup_bucket()
+DATE_BUCKET_EXPRESSIONS = {
+    'sqlite': {
+        'month': lambda column: func.strftime('%Y-%m', column),
+        # 'weekday 0' moves forward to Sunday (or stays), minus 6 days is that week's Monday
+        'week': lambda column: func.date(column, 'weekday 0', '-6 days'),
+    },
+    'postgresql': {
+        # Inline literals keep SELECT and GROUP BY textually identical under server-side binding
+        'month': lambda column: func.to_char(func.date_trunc(literal_column("'month'"), column), literal_column("'YYYY-MM'")),
+        'week': lambda column: func.to_char(func.date_trunc(literal_column("'week'"), column), literal_column("'YYYY-MM-DD'")),
+    },
+}
+
+def date_bucket(unit, column):
+    """SQL expression truncating ``column`` to a 'month' or 'week' key for the current dialect"""
+    dialect = db.engine.dialect.name
+    try:
+        return DATE_BUCKET_EXPRESSIONS[dialect][unit](column)
+    except KeyError:
+        raise ValueError(f'No {unit} bucketing available for database dialect {dialect}')
+
+def aggregate_waste_entries(*group_by, **filters):
+    """SELECT counting and summing waste entries, grouped by the given columns/expressions.
+    
+    Rows are ``(*group_values, entry_count, total_weight)``, so no ORM objects
+    are loaded; the statement can be executed or fed to INSERT ... SELECT.
+    Keyword arguments are equality filters on WasteEntry.
+    """
+    statement = select(
+        *group_by,
+        func.count(WasteEntry.id),
+        func.coalesce(func.sum(WasteEntry.weight_kg), 0.0)
+    ).select_from(WasteEntry)
+    if filters:
+        statement = statement.where(*(getattr(WasteEntry, name) == value for name, value in filters.items()))
+    if group_by:
+        statement = statement.group_by(*group_by)
+    return statement
+
+# Recycling center spatial index
+KM_PER_DEGREE_LAT = 111.32
+RECYCLING_CENTER_INDEX_TTL = 300  # seconds; bounds staleness from writes in other processes
+
+def bounding_box(lat, lng, radius_km):
+    """(min_lat, max_lat, min_lng, max_lng) enclosing a radius around a point"""
+    lat_span = radius_km / KM_PER_DEGREE_LAT
+    # Degrees of longitude shrink towards the poles; clamp to avoid dividing by ~0
+    lng_span = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+    return lat - lat_span, lat + lat_span, lng - lng_span, lng + lng_span
+
+class RecyclingCenterIndex:
+    """In-memory lat/lng grid over active recycling centers.
+    
+    Centers are bucketed into square cells of ``cell_size`` degrees, so radius
+    and k-nearest queries only measure distances to centers in nearby cells.
+    The grid is built lazily from the recycling_center table, dropped whenever
+    a commit in this process touches a RecyclingCenter, and expires after
+    ``ttl`` seconds so changes made by other processes show up too. Until it
+    is rebuilt, callers fall back to SQL.
+    """
+    
+    def __init__(self, cell_size=0.1, ttl=RECYCLING_CENTER_INDEX_TTL):
+        self.cell_size = cell_size
+        self.ttl = ttl
+        self._cells = None  # {(row, col): [(center_id, lat, lng), ...]}
+        self._bounds = None  # (min_row, max_row, min_col, max_col)
+        self._center_count = 0
+        self._expires_at = 0
+        self._generation = 0  # bumped by invalidate() so in-flight builds can tell they're stale
+        self._lock = threading.Lock()
+        self._building = False
+    
+    def _current(self):
+        """(cells, bounds, center_count) of a built, unexpired grid, or (None, None, 0)"""
+        with self._lock:
+            if self._cells is None or time.monotonic() >= self._expires_at:
+                return None, None, 0
+            return self._cells, self._bounds, self._center_count
+    
+    def _cell(self, lat, lng):
+        return int(math.floor(lat / self.cell_size)), int(math.floor(lng / self.cell_size))
+    
+    def build(self):
+        """Load active center coordinates and replace the grid (needs an app context)"""
+        with self._lock:
+            generation = self._generation
+        cells = {}
+        rows = db.session.query(RecyclingCenter.id, RecyclingCenter.latitude, RecyclingCenter.longitude)\
+            .filter(RecyclingCenter.is_active == True).all()
+        for center_id, lat, lng in rows:
+            cells.setdefault(self._cell(lat, lng), []).append((center_id, lat, lng))
+        
+        bounds = None
+        if cells:
+            cell_rows = [row for row, _ in cells]
+            cell_cols = [col for _, col in cells]
+            bounds = (min(cell_rows), max(cell_rows), min(cell_cols), max(cell_cols))
+        with self._lock:
+            # Centers changed while we were reading; leave the grid cold for a fresh build
+            if generation != self._generation:
+                return
+            self._cells, self._bounds, self._center_count = cells, bounds, len(rows)
+            self._expires_at = time.monotonic() + self.ttl
+    
+    def warm_in_background(self):
+        """Rebuild the grid off the request path, at most one build at a time"""
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        socketio.start_background_task(self._background_build)
+    
+    def _background_build(self):
+        try:
+            with app.app_context():
+                self.build()
+        except Exception as e:
+            print(f"Recycling center index build error: {e}")
+        finally:
+            with self._lock:
+                self._building = False
+    
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._cells, self._bounds, self._center_count = None, None, 0
+    
+    def _candidates(self, cells, row_range, col_range):
+        return self._candidates_in(cells, ((row, col) for row in row_range for col in col_range))
+    
+    def _candidates_in(self, cells, cell_keys):
+        for cell in cell_keys:
+            yield from cells.get(cell, ())
+    
+    def within_radius(self, lat, lng, radius_km):
+        """Sorted [(distance_km, center_id)] within the radius, or None if the index is cold"""
+        cells, _, _ = self._current()
+        if cells is None:
+            return None
+        
+        min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+        min_row, min_col = self._cell(min_lat, min_lng)
+        max_row, max_col = self._cell(max_lat, max_lng)
+        
+        candidates = list(self._candidates(cells, range(min_row, max_row + 1), range(min_col, max_col + 1)))
+        matches = [match for match in measure_centers(lat, lng, candidates) if match[0] <= radius_km]
+        matches.sort()
+        return matches
+    
+    def _ring_cells(self, row, col, ring, bounds):
+        """Cells on the border of the square ``ring`` cells out from (row, col), clipped to bounds"""
+        if ring == 0:
+            return [(row, col)]
+        min_row, max_row, min_col, max_col = bounds
+        ring_cells = []
+        cols = range(max(col - ring, min_col), min(col + ring, max_col) + 1)
+        for r in (row - ring, row + ring):
+            if min_row <= r <= max_row:
+                ring_cells.extend((r, c) for c in cols)
+        rows = range(max(row - ring + 1, min_row), min(row + ring - 1, max_row) + 1)
+        for c in (col - ring, col + ring):
+            if min_col <= c <= max_col:
+                ring_cells.extend((r, c) for r in rows)
+        return ring_cells
+    
+    def _unsearched_km(self, lat, lng, row, col, ring, bounds):
+        """Lower bound on the distance from (lat, lng) to any center outside the searched rings.
+        
+        Only sides of the square that still have occupied cells beyond them
+        count; returns infinity once the whole grid has been searched.
+        """
+        size = self.cell_size
+        min_row, max_row, min_col, max_col = bounds
+        lat_gaps = []
+        if row - ring > min_row:
+            lat_gaps.append(lat - (row - ring) * size)
+        if row + ring < max_row:
+            lat_gaps.append((row + ring + 1) * size - lat)
+        # (nearest, farthest) longitude offset of the unsearched columns on each side
+        lng_gaps = []
+        if col - ring > min_col:
+            lng_gaps.append((lng - (col - ring) * size, lng - min_col * size))
+        if col + ring < max_col:
+            lng_gaps.append(((col + ring + 1) * size - lng, (max_col + 1) * size - lng))
+        
+        bound = math.inf
+        for gap in lat_gaps:
+            # Two points are never closer than their difference in latitude
+            bound = min(bound, EARTH_RADIUS_KM * math.radians(max(gap, 0)))
+        if lng_gaps:
+            # ...nor closer than their longitude difference at the highest latitude either can have
+            max_lat = min(max(abs(lat), abs(min_row * size), abs((max_row + 1) * size)), 90)
+            cos_lat = math.cos(math.radians(max_lat))
+            for near, far in lng_gaps:
+                delta = min(max(min(near, 360 - far), 0), 180)  # longitudes wrap at ±180
+                half_chord = min(cos_lat * math.sin(math.radians(delta) / 2), 1.0)
+                bound = min(bound, 2 * EARTH_RADIUS_KM * math.asin(half_chord))
+        return bound
+    
+    def nearest(self, lat, lng, k):
+        """The k closest [(distance_km, center_id)], or None if the index is cold.
+        
+        Searches rings of cells outwards from the occupied cell closest to the
+        query and stops once the k-th best distance is closer than anything an
+        unsearched ring could contain. When the rings would visit more cells
+        than there are centers, measuring every center is cheaper, so it does
+        that instead.
+        """
+        cells, bounds, center_count = self._current()
+        if cells is None:
+            return None
+        if not cells or k <= 0:
+            return []
+        
+        min_row, max_row, min_col, max_col = bounds
+        row, col = self._cell(lat, lng)
+        row, col = min(max(row, min_row), max_row), min(max(col, min_col), max_col)
+        max_ring = max(row - min_row, max_row - row, col - min_col, max_col - col)
+        
+        found = []
+        visited = 0
+        for ring in range(max_ring + 1):
+            ring_cells = self._ring_cells(row, col, ring, bounds)
+            visited += len(ring_cells)
+            if visited > center_count:
+                everything = list(self._candidates_in(cells, cells))
+                return sorted(measure_centers(lat, lng, everything))[:k]
+            found.extend(measure_centers(lat, lng, list(self._candidates_in(cells, ring_cells))))
+            
+            if len(found) >= k:
+                found.sort()
+                if found[k - 1][0] <= self._unsearched_km(lat, lng, row, col, ring, bounds):
+                    break
+        
+        found.sort()
+        return found[:k]
+
+recycling_center_index = RecyclingCenterIndex()
+
+@event.listens_for(RecyclingCenter, 'after_insert')
+@event.listens_for(RecyclingCenter, 'after_update')
+@event.listens_for(RecyclingCenter, 'after_delete')
+def _mark_recycling_centers_changed(mapper, connection, target):
+    object_session(target).info['recycling_centers_changed'] = True
+
+@event.listens_for(OrmSession, 'after_commit')
+def _invalidate_recycling_center_index(session):
+    if session.info.pop('recycling_centers_changed', False):
+        recycling_center_index.invalidate()
+
+@event.listens_for(OrmSession, 'after_rollback')
+def _discard_recycling_center_changes(session):
+    session.info.pop('recycling_centers_changed', None)
+
+def nearby_centers_from_database(lat, lng, radius_km):
+    """Sorted [(distance_km, center_id)] using a bounding-box SQL prefilter"""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    rows = db.session.query(RecyclingCenter.id, RecyclingCenter.latitude, RecyclingCenter.longitude).filter(
+        RecyclingCenter.is_active == True,
+        RecyclingCenter.latitude.between(min_lat, max_lat),
+        RecyclingCenter.longitude.between(min_lng, max_lng)
+    ).all()
+    
+    matches = [match for match in measure_centers(lat, lng, rows) if match[0] <= radius_km]
+    matches.sort()
+    return matches
+
+# Goal progress
+GOAL_COMPLETED_MESSAGES = {
+    'reduce': 'You achieved your goal to reduce waste to {target} {unit}!',
+    'recycle': 'You achieved your recycling goal of {target} {unit}!',
+    'track': 'You tracked {target} waste entries!',
+}
+
+def goal_contribution(goal, state):
+    """How much a single entry state counts towards a goal's current value"""
+    if state is None:
+        return 0
+    # If start_date is set, count from that date; otherwise count all entries
+    if goal.start_date and state.disposal_date < goal.start_date:
+        return 0
+    if goal.end_date and state.disposal_date > goal.end_date:
+        return 0
+    
+    if goal.goal_type == 'reduce':
+        return state.weight_kg
+    elif goal.goal_type == 'recycle':
+        if not state.recycled:
+            return 0
+        return 1 if goal.unit == 'count' else state.weight_kg
+    elif goal.goal_type == 'track':
+        return 1
+    return 0
+
+def goal_progress(goal):
+    """Compute a goal's current value from scratch with one aggregate query"""
+    if goal.goal_type == 'track' or (goal.goal_type == 'recycle' and goal.unit == 'count'):
+        value = func.count(WasteEntry.id)
+    else:
+        value = func.coalesce(func.sum(WasteEntry.weight_kg), 0.0)
+    
+    query = db.session.query(value).filter(WasteEntry.user_id == goal.user_id)
+    if goal.start_date:
+        query = query.filter(WasteEntry.disposal_date >= goal.start_date)
+    if goal.end_date:
+        query = query.filter(WasteEntry.disposal_date <= goal.end_date)
+    if goal.goal_type == 'recycle':
+        query = query.filter(WasteEntry.recycled == True)
+    elif goal.goal_type not in GOAL_COMPLETED_MESSAGES:
+        return 0
+    return query.scalar() or 0
+
+def evaluate_goal_completion(goal):
+    """Update is_completed from current_value, notifying the user when a goal is reached"""
+    if goal.goal_type not in GOAL_COMPLETED_MESSAGES:
+        return
+    
+    was_completed = goal.is_completed
+    if goal.goal_type == 'reduce':
+        # Reduce goals are met while waste stays at or below the target
+        reached = goal.current_value <= goal.target_value
+        if not reached and was_completed:
+            # Goal was completed but now exceeded - mark as not completed
+            goal.is_completed = False
+    else:
+        reached = goal.current_value >= goal.target_value
+    
+    if reached and not was_completed:
+        goal.is_completed = True
+        create_notification(goal.user_id, 'Goal Achieved!',
+                            GOAL_COMPLETED_MESSAGES[goal.goal_type].format(target=goal.target_value, unit=goal.unit),
+                            'achievement', '/goals', commit=False)
+
+def advance_goals(user_id, changes):
+    """Apply a user's (before, after) entry changes to their goals' current values"""
+    # Status-only changes (e.g. admin updates) never move goal progress
+    changes = [(before, after) for before, after in changes
+               if before is None or after is None
+               or (before.disposal_date, before.recycled, before.weight_kg)
+               != (after.disposal_date, after.recycled, after.weight_kg)]
+    if not changes:
+        return
+    
+    for goal in WasteGoal.query.filter_by(user_id=user_id).all():
+        delta = sum(goal_contribution(goal, after) - goal_contribution(goal, before)
+                    for before, after in changes)
+        if delta:
+            goal.current_value = (goal.current_value or 0) + delta
+            evaluate_goal_completion(goal)
+
+def refresh_goal(goal):
+    """Recompute a goal's progress from its entries (new goals and reconciliation)"""
+    goal.current_value = goal_progress(goal)
+    evaluate_goal_completion(goal)
+
+def reconcile_goal_progress(user_id=None):
+    """Recompute all goals (or one user's) to correct any drift in incremental progress"""
+    goals = WasteGoal.query
+    if user_id is not None:
+        goals = goals.filter_by(user_id=user_id)
+    for goal in goals.all():
+        refresh_goal(goal)
+    db.session.commit()
+
+@app.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Recompute statistics rollups and user counters from waste entries to correct drift"""
+    rebuild_waste_rollups()
+    rebuild_user_counters()
+    click.echo('Statistics rollups and user counters rebuilt')
+
+@app.cli.command('reconcile-goals')
+def reconcile_goals_command():
+    """Recompute every goal's progress from waste entries (run periodically, e.g. from cron)"""
+    reconcile_goal_progress()
+    click.echo('Goal progress reconciled')
+
+# Achievements
+# Each rule unlocks once its counter metric (a UserWasteCounter column) reaches the threshold
+AchievementRule = namedtuple('AchievementRule', ['achievement_type', 'metric', 'threshold', 'title', 'description'])
+
+ACHIEVEMENT_RULES = [
+    AchievementRule('first_entry', 'entry_count', 1, 'First Step', 'Tracked your first waste entry!'),
+    AchievementRule('five_entries', 'entry_count', 5, 'Getting Started', 'Tracked 5 waste entries!'),
+    AchievementRule('ten_entries', 'entry_count', 10, 'Waste Warrior', 'Tracked 10 waste entries!'),
+    AchievementRule('twenty_five_entries', 'entry_count', 25, 'Eco Champion', 'Tracked 25 waste entries!'),
+    AchievementRule('first_recycle', 'recycled_count', 1, 'Recycler', 'Recycled your first item!'),
+    AchievementRule('ten_recycles', 'recycled_count', 10, 'Recycling Master', 'Recycled 10 items!'),
+    AchievementRule('fifty_kg_recycled', 'recycled_weight', 50, 'Eco Hero', 'Recycled 50 kg of waste!'),
+]
+
+COUNTER_METRICS = ['entry_count', 'total_weight', 'recycled_count', 'recycled_weight']
+
+def counter_values(user_id):
+    """Current running counters for a user as a dict (fresh from the database)"""
+    row = db.session.query(
+        *(getattr(UserWasteCounter, metric) for metric in COUNTER_METRICS)
+    ).filter(UserWasteCounter.user_id == user_id).first()
+    return dict(zip(COUNTER_METRICS, row or (0,) * len(COUNTER_METRICS)))
+
+def unlock_achievements(user_id, rules):
+    """Add achievements (and their notifications) for rules the user hasn't unlocked yet"""
+    unlocked = {achievement_type for (achievement_type,) in db.session.query(Achievement.achievement_type)
+                .filter(Achievement.user_id == user_id)}
+    for rule in rules:
+        if rule.achievement_type in unlocked:
+            continue
+        db.session.add(Achievement(
+            user_id=user_id,
+            achievement_type=rule.achievement_type,
+            title=rule.title,
+            description=rule.description
+        ))
+        db.session.add(Notification(
+            user_id=user_id,
+            title='🏆 Achievement Unlocked!',
+            message=f'{rule.title}: {rule.description}',
+            notification_type='achievement',
+            link='/dashboard'
+        ))
+
+def award_achievements(user_id, delta):
+    """Unlock achievements whose threshold was crossed by a counter delta.
+    
+    ``delta`` maps counter metrics to how much they just changed; only rules
+    on metrics that went up are considered, so most writes cost no queries.
+    """
+    rules = [rule for rule in ACHIEVEMENT_RULES if delta.get(rule.metric, 0) > 0]
+    if not rules:
+        return
     
-    # Get user stats if user_id provided
-    user_stats = {}
-    if user_id:
+    current = counter_values(user_id)
+    crossed = [rule for rule in rules
+               if current[rule.metric] - delta[rule.metric] < rule.threshold <= current[rule.metric]]
+    if crossed:
+        unlock_achievements(user_id, crossed)
+
+def reconcile_achievements():
+    """Unlock every achievement users already qualify for, e.g. after a counter rebuild"""
+    for counter in UserWasteCounter.query.all():
+        qualified = [rule for rule in ACHIEVEMENT_RULES
+                     if getattr(counter, rule.metric) >= rule.threshold]
+        if qualified:
+            unlock_achievements(counter.user_id, qualified)
+    db.session.commit()
+
+# Bulk ingestion
+BULK_MAX_ENTRIES = 1000
+WASTE_TYPES = ['organic', 'recyclable', 'hazardous', 'other']
+
+class BulkItemError(Exception):
+    """A bulk ingestion item that failed validation"""
+
+def parse_weight_kg(value):
+    """A submitted weight as a finite, non-negative float (None stays None); raises ValueError"""
+    if value is None:
+        return None
+    try:
+        if isinstance(value, bool):
+            raise TypeError
+        weight_kg = float(value)
+    except (TypeError, ValueError):
+        raise ValueError('weight_kg must be a non-negative number')
+    # float() accepts "nan" and "inf", which would poison the rollup sums
+    if not math.isfinite(weight_kg) or weight_kg < 0:
+        raise ValueError('weight_kg must be a non-negative number')
+    return weight_kg
+
+def validate_bulk_entry(user_id, item):
+    """Turn one submitted item into a waste_entry row dict, or raise BulkItemError"""
+    if isinstance(item, BulkItemError):
+        raise item
+    if not isinstance(item, dict):
+        raise BulkItemError('Entry must be a JSON object')
+    
+    waste_type = item.get('waste_type')
+    if waste_type not in WASTE_TYPES:
+        raise BulkItemError(f"waste_type must be one of: {', '.join(WASTE_TYPES)}")
+    
+    weight_kg = item.get('weight_kg')
+    if weight_kg is not None:
+        # json.loads accepts NaN and Infinity, which would poison the rollup sums
+        if (isinstance(weight_kg, bool) or not isinstance(weight_kg, (int, float))
+                or not math.isfinite(weight_kg) or weight_kg < 0):
+            raise BulkItemError('weight_kg must be a non-negative number')
+        weight_kg = float(weight_kg)
+    
+    description = item.get('description') or ''
+    if not isinstance(description, str):
+        raise BulkItemError('description must be a string')
+    
+    disposal_date = datetime.utcnow()
+    if item.get('disposal_date'):
         try:
-            user = User.query.get(user_id)
-            if user:
-                total_entries = WasteEntry.query.filter_by(user_id=user_id).count()
-                recycled_count = WasteEntry.query.filter_by(user_id=user_id, recycled=True).count()
-                total_weight = db.session.query(db.func.sum(WasteEntry.weight_kg)).filter_by(user_id=user_id).scalar() or 0
-                user_stats = {
-                    'total_entries': total_entries,
-                    'recycled_count': recycled_count,
-                    'total_weight': round(total_weight, 2)
-                }
-        except:
-            pass
+            disposal_date = datetime.fromisoformat(item['disposal_date'])
+        except (TypeError, ValueError):
+            raise BulkItemError('disposal_date must be an ISO 8601 date/time')
+        # Stored naive in UTC like every other entry
+        if disposal_date.tzinfo is not None:
+            disposal_date = disposal_date.astimezone(timezone.utc).replace(tzinfo=None)
+    
+    recycled = item.get('recycled', False)
+    if not isinstance(recycled, bool):
+        raise BulkItemError('recycled must be true or false')
+    
+    return {
+        'user_id': user_id,
+        'waste_type': waste_type,
+        'weight_kg': weight_kg,
+        'description': description,
+        'disposal_date': disposal_date,
+        'recycled': recycled,
+        'status': 'new'
+    }
+
+def ingest_waste_entries(user_id, items):
+    """Validate and insert many entries in one transaction; returns per-item results.
+    
+    Valid rows go in with a single multi-row INSERT, and rollups, counters,
+    achievements and goals are updated once for the whole batch.
+    """
+    results = []
+    rows = []
+    for index, item in enumerate(items):
+        try:
+            rows.append(validate_bulk_entry(user_id, item))
+            results.append({'index': index, 'status': 'created'})
+        except BulkItemError as e:
+            results.append({'index': index, 'status': 'error', 'error': str(e)})
+    
+    if not rows:
+        return results
+    
+    inserted_ids = db.session.execute(
+        insert(WasteEntry).returning(WasteEntry.id, sort_by_parameter_order=True), rows
+    ).scalars().all()
+    record_waste_changes([
+        (None, WasteEntryState(user_id=row['user_id'], waste_type=row['waste_type'],
+                               disposal_date=row['disposal_date'], status=row['status'],
+                               recycled=row['recycled'], weight_kg=row['weight_kg'] or 0))
+        for row in rows
+    ])
+    db.session.commit()
     
-    if any(word in message_lower for word in ['recycle', 'recycling', 'center']):
-        response = "I can help you find recycling centers! Check the 'Recycling Centers' page or tell me your location."
-        if user_stats.get('recycled_count', 0) > 0:
-            response += f" You've recycled {user_stats['recycled_count']} items so far! 🌱"
-        return response
+    created = iter(inserted_ids)
+    for result in results:
+        if result['status'] == 'created':
+            result['id'] = next(created)
+    return results
+
+# Bulk status transitions
+STATUS_NOTIFICATION_MAX_IDS = 10  # entry ids listed in a summary notification
+
+def status_update_message(entry_ids, new_status):
+    """Notification text summarising one user's entries moved to a new status"""
+    if len(entry_ids) == 1:
+        return f'Your waste entry (ID: {entry_ids[0]}) status has been updated to {new_status.title()} by admin.'
+    shown = ', '.join(str(entry_id) for entry_id in entry_ids[:STATUS_NOTIFICATION_MAX_IDS])
+    if len(entry_ids) > STATUS_NOTIFICATION_MAX_IDS:
+        shown += f' and {len(entry_ids) - STATUS_NOTIFICATION_MAX_IDS} more'
+    return f'{len(entry_ids)} of your waste entries (IDs: {shown}) have been updated to {new_status.title()} by admin.'
+
+def transition_waste_statuses(entry_ids, new_status, admin_id):
+    """Move many entries to new_status in one transaction; returns {entry_id: outcome}.
+    
+    Outcomes are 'updated', 'unchanged' (already in that status, or moved by
+    someone else meanwhile) or 'not_found'. There is one UPDATE ... WHERE id IN
+    per current status, and each affected user gets one notification listing
+    their entries.
+    """
+    outcomes = dict.fromkeys(entry_ids, 'not_found')
+    ids_by_status = {}
+    for entry_id, status in db.session.query(WasteEntry.id, WasteEntry.status).filter(WasteEntry.id.in_(list(outcomes))):
+        outcomes[entry_id] = 'unchanged'
+        if (status or 'new') != new_status:
+            ids_by_status.setdefault(status or 'new', []).append(entry_id)
+    
+    now = datetime.utcnow()
+    changes = []
+    changed_by_user = {}
+    for old_status, ids in ids_by_status.items():
+        # Conditioned on the status read above and deltas taken from the rows actually
+        # updated, so concurrent admins can't apply the same rollup change twice
+        updated = db.session.execute(
+            update(WasteEntry)
+            .where(WasteEntry.id.in_(ids), func.coalesce(WasteEntry.status, 'new') == old_status)
+            .values(status=new_status, status_updated_at=now, status_updated_by=admin_id)
+            .returning(WasteEntry.id, WasteEntry.user_id, WasteEntry.waste_type, WasteEntry.disposal_date,
+                       WasteEntry.recycled, WasteEntry.weight_kg),
+            execution_options={'synchronize_session': False}
+        ).all()
+        for row in updated:
+            before = WasteEntryState(user_id=row.user_id, waste_type=row.waste_type, disposal_date=row.disposal_date,
+                                     status=old_status, recycled=bool(row.recycled), weight_kg=row.weight_kg or 0)
+            outcomes[row.id] = 'updated'
+            changes.append((before, before._replace(status=new_status)))
+            changed_by_user.setdefault(row.user_id, []).append(row.id)
+    
+    if not changes:
+        db.session.commit()
+        return outcomes
+    
+    record_waste_changes(changes)
+    
+    notifications = [{
+        'user_id': user_id,
+        'title': 'Waste Status Updated',
+        'message': status_update_message(sorted(ids), new_status),
+        'notification_type': 'info',
+        'is_read': False,
+        'created_at': now,
+        'link': '/track-waste'
+    } for user_id, ids in changed_by_user.items()]
+    notification_ids = db.session.execute(
+        insert(Notification).returning(Notification.id, sort_by_parameter_order=True), notifications
+    ).scalars().all()
+    # Bulk inserts skip the after_insert mapper event, so queue the pushes here
+    pending = db.session.info.setdefault('pending_notifications', [])
+    for notification_id, row in zip(notification_ids, notifications):
+        pending.append((row['user_id'], notification_payload(Notification(id=notification_id, **row))))
     
-    elif any(word in message_lower for word in ['pickup', 'schedule', 'collection']):
-        return "You can view pickup schedules on the 'Pickup Schedules' page. What area are you in? I can also remind you about upcoming pickups!"
+    db.session.commit()
+    return outcomes
+
+# Keyset pagination
+TRACK_WASTE_PAGE_SIZE = 20
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+
+def encode_cursor(timestamp, row_id):
+    """Opaque cursor pointing just after the row with this (timestamp, id)"""
+    raw = json.dumps([timestamp.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (TypeError, binascii.Error, json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ValueError(f'Invalid cursor: {e}')
+
+def keyset_query(query, timestamp_column, id_column, limit, after=None):
+    """``query`` narrowed to the page after ``after``, newest first by (timestamp, id).
+    
+    Fetches one row past ``limit`` so the caller can tell whether another page
+    follows. Raises ValueError for malformed cursors.
+    """
+    if after:
+        timestamp, row_id = decode_cursor(after)
+        query = query.filter(or_(
+            timestamp_column < timestamp,
+            and_(timestamp_column == timestamp, id_column < row_id)
+        ))
+    return query.order_by(timestamp_column.desc(), id_column.desc()).limit(limit + 1)
+
+def keyset_page(query, timestamp_column, id_column, limit, after=None):
+    """One page of ``query`` ordered newest first by (timestamp, id).
+    
+    Returns (rows, next_cursor); next_cursor is None on the last page. Pages
+    continue from a cursor with a range condition instead of OFFSET, so deep
+    pages cost the same as the first one.
+    """
+    rows = keyset_query(query, timestamp_column, id_column, limit, after).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, timestamp_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
+
+def user_waste_entries_query(user_id, status=None):
+    """A user's waste entries (optionally of one status) with their status updater eager-loaded"""
+    query = WasteEntry.query.options(joinedload(WasteEntry.status_updater)).filter_by(user_id=user_id)
+    if status:
+        query = query.filter_by(status=status)
+    return query
+
+def admin_waste_entries_query(status='all', waste_type='all'):
+    """All waste entries matching the admin filters, loading each entry's user and status updater in the same query"""
+    query = WasteEntry.query.options(
+        joinedload(WasteEntry.user),
+        joinedload(WasteEntry.status_updater)
+    )
+    if status != 'all':
+        query = query.filter_by(status=status)
+    if waste_type != 'all':
+        query = query.filter_by(waste_type=waste_type)
+    return query
+
+def admin_users_query(search=''):
+    """(rows query, count query) for the admin users page, optionally narrowed by a search term.
+    
+    Only the columns shown are selected, with entry totals from the maintained
+    per-user counters.
+    """
+    query = db.session.query(
+        User.id,
+        User.username,
+        User.email,
+        User.city,
+        User.is_admin,
+        User.created_at,
+        func.coalesce(UserWasteCounter.entry_count, 0).label('entry_count'),
+        func.coalesce(UserWasteCounter.total_weight, 0.0).label('total_weight')
+    ).outerjoin(UserWasteCounter, UserWasteCounter.user_id == User.id)
+    count_query = db.session.query(func.count(User.id))
+    
+    if search:
+        pattern = f'%{search}%'
+        matches = or_(User.username.ilike(pattern), User.email.ilike(pattern), User.city.ilike(pattern))
+        query = query.filter(matches)
+        count_query = count_query.filter(matches)
+    return query, count_query
+
+ADMIN_PAGE_SIZE = 50
+COUNT_ESTIMATE_TTL = 60  # seconds
+
+_count_estimates = {}  # (status, waste_type) -> (expires_at, count)
+_count_estimates_lock = threading.Lock()
+
+def waste_entry_estimate_query(status='all', waste_type='all'):
+    """Rollup sum behind estimate_waste_entry_count"""
+    query = db.session.query(func.coalesce(func.sum(UserWasteRollup.entry_count), 0))
+    if status != 'all':
+        query = query.filter(UserWasteRollup.status == status)
+    if waste_type != 'all':
+        query = query.filter(UserWasteRollup.waste_type == waste_type)
+    return query
+
+def estimate_waste_entry_count(status='all', waste_type='all'):
+    """Approximate number of entries matching the admin filters.
+    
+    Summed from the statistics rollups (far fewer rows than waste_entry) and
+    cached for COUNT_ESTIMATE_TTL seconds, so paging doesn't recount.
+    Legacy entries without a status are counted as 'new'.
+    """
+    key = (status, waste_type)
+    now = time.monotonic()
+    with _count_estimates_lock:
+        cached = _count_estimates.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+    
+    count = waste_entry_estimate_query(status, waste_type).scalar()
+    
+    with _count_estimates_lock:
+        _count_estimates[key] = (now + COUNT_ESTIMATE_TTL, count)
+    return count
+
+# Data export
+EXPORT_BATCH_SIZE = 1000
+
+# (key, CSV header) for each exported column; admin exports prepend the user columns
+EXPORT_FIELDS = [
+    ('disposal_date', 'Date'),
+    ('waste_type', 'Waste Type'),
+    ('weight_kg', 'Weight (kg)'),
+    ('description', 'Description'),
+    ('recycled', 'Recycled'),
+]
+ADMIN_EXPORT_FIELDS = [('user_id', 'User ID'), ('username', 'Username')] + EXPORT_FIELDS
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+def export_batches(user_id=None):
+    """Stream waste entry rows in batches of EXPORT_BATCH_SIZE plain tuples.
+    
+    Rows are fetched with yield_per (a server-side cursor on PostgreSQL), so
+    memory stays bounded by one batch regardless of the export size.
+    """
+    columns = [WasteEntry.disposal_date, WasteEntry.waste_type, WasteEntry.weight_kg,
+               WasteEntry.description, WasteEntry.recycled]
+    if user_id is None:
+        stmt = select(WasteEntry.user_id, User.username, *columns)\
+            .join(User, User.id == WasteEntry.user_id).order_by(WasteEntry.id)
+    else:
+        stmt = select(*columns).where(WasteEntry.user_id == user_id).order_by(WasteEntry.id)
     
-    elif any(word in message_lower for word in ['waste', 'dispose', 'trash', 'garbage']):
-        response = "You can track your waste disposal on the 'Track Waste' page. What type of waste do you need to dispose of?"
-        if user_stats.get('total_entries', 0) > 0:
-            response += f" You've tracked {user_stats['total_entries']} waste entries."
-        return response
+    result = db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    for batch in result.partitions():
+        yield batch
+
+def _csv_value(key, value):
+    if key == 'disposal_date':
+        return value.strftime('%Y-%m-%d')
+    if key == 'recycled':
+        return 'Yes' if value else 'No'
+    if key == 'weight_kg':
+        return value or ''
+    return '' if value is None else value
+
+def stream_csv(fields, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for _, header in fields])
+    yield buffer.getvalue()
+    
+    keys = [key for key, _ in fields]
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(key, value) for key, value in zip(keys, row)] for row in batch)
+        yield buffer.getvalue()
+
+def stream_ndjson(fields, batches):
+    keys = [key for key, _ in fields]
+    for batch in batches:
+        lines = []
+        for row in batch:
+            record = dict(zip(keys, row))
+            record['disposal_date'] = record['disposal_date'].isoformat()
+            record['recycled'] = bool(record['recycled'])
+            lines.append(json.dumps(record))
+        yield '\n'.join(lines) + '\n'
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain()"""
     
-    elif any(word in message_lower for word in ['stat', 'statistic', 'progress', 'how much']):
-        if user_stats:
-            return f"Here's your progress: {user_stats['total_entries']} waste entries tracked, {user_stats['recycled_count']} items recycled, {user_stats['total_weight']} kg total. Great job! 🎉"
-        return "Check your dashboard for detailed statistics and progress!"
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
     
-    elif any(word in message_lower for word in ['tip', 'tips', 'segregation', 'separate']):
-        return "Check out the 'Waste Tips' page for helpful information on waste segregation and disposal! I can also give you specific tips - just ask!"
+    def writable(self):
+        return True
     
-    elif any(word in message_lower for word in ['goal', 'target', 'challenge']):
-        return "You can set waste reduction goals on your dashboard! Try setting a goal to reduce waste or increase recycling. Would you like help setting one up?"
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
     
-    elif any(word in message_lower for word in ['hello', 'hi', 'hey', 'greeting']):
-        return "Hello! I'm Ecotrack assistant. How can I help you with waste management today? I can help with tracking, finding centers, schedules, and tips!"
+    def tell(self):
+        return self._position
     
-    elif any(word in message_lower for word in ['help', 'support', 'what can you']):
-        return "I can help you with: finding recycling centers, checking pickup schedules, tracking waste, setting goals, viewing statistics, and providing waste management tips. What do you need?"
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def stream_parquet(fields, batches):
+    """One Parquet row group per batch, emitted as soon as it is written"""
+    types = {
+        'user_id': pa.int64(),
+        'username': pa.string(),
+        'disposal_date': pa.timestamp('us'),
+        'waste_type': pa.string(),
+        'weight_kg': pa.float64(),
+        'description': pa.string(),
+        'recycled': pa.bool_(),
+    }
+    keys = [key for key, _ in fields]
+    schema = pa.schema([(key, types[key]) for key in keys])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    
+    for batch in batches:
+        columns = list(zip(*batch))
+        writer.write_table(pa.Table.from_arrays(
+            [pa.array(values, type=types[key]) for key, values in zip(keys, columns)], schema=schema
+        ))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+EXPORT_WRITERS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+    'parquet': stream_parquet,
+}
+
+def export_response(export_format, fields, batches, filename):
+    """Streamed download of ``batches`` in the requested format"""
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    return Response(
+        stream_with_context(EXPORT_WRITERS[export_format](fields, batches)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}.{extension}'}
+    )
+
+def export_format_error(export_format):
+    """Flash message for an unusable ?format=, or None if it can be served"""
+    if export_format not in EXPORT_FORMATS:
+        return f'Unknown export format: {export_format}'
+    if export_format == 'parquet' and pa is None:
+        return 'Parquet export requires pyarrow to be installed'
+    return None
+
+# Dashboard counters
+WASTE_STATUSES = ['new', 'waiting', 'disposed']
+ADMIN_RECENT_ENTRIES = {'new': 5, 'waiting': 3, 'disposed': 2}  # prioritize new, then waiting, then disposed
+
+def waste_status_counters_query(user_id=None):
+    """Total, recycled and per-status entry counts summed from the statistics rollups"""
+    query = db.session.query(
+        func.sum(UserWasteRollup.entry_count),
+        func.sum(case((UserWasteRollup.recycled == True, UserWasteRollup.entry_count), else_=0)),
+        *(func.sum(case((UserWasteRollup.status == status, UserWasteRollup.entry_count), else_=0))
+          for status in WASTE_STATUSES)
+    )
+    if user_id is not None:
+        query = query.filter(UserWasteRollup.user_id == user_id)
+    return query
+
+def waste_status_counters(user_id=None):
+    """Total, recycled and per-status entry counts for one user (or everyone) in a single query.
+    
+    Read from the rollups rather than waste_entry, so the admin dashboard's
+    global counts don't scan every entry. Legacy entries without a status are
+    counted as 'new'.
+    """
+    total, recycled, *status_counts = waste_status_counters_query(user_id).one()
+    counters = {'total': total or 0, 'recycled': recycled or 0}
+    counters.update((status, count or 0) for status, count in zip(WASTE_STATUSES, status_counts))
+    return counters
+
+def waste_totals_by_type_query():
+    """(waste_type, entry_count, total_weight) over all users, summed from the rollups"""
+    return db.session.query(
+        UserWasteRollup.waste_type,
+        func.sum(UserWasteRollup.entry_count),
+        func.coalesce(func.sum(UserWasteRollup.total_weight), 0.0)
+    ).group_by(UserWasteRollup.waste_type).having(func.sum(UserWasteRollup.entry_count) > 0)
+
+def recent_entries_query(limits):
+    """Query behind recent_entries_by_status, in no particular order"""
+    recent_ids = union_all(*(
+        select(WasteEntry.id)
+        .where(WasteEntry.status == status)
+        .order_by(WasteEntry.disposal_date.desc())
+        .limit(limit)
+        .subquery()
+        .select()
+        for status, limit in limits.items()
+    )).subquery()
+    return WasteEntry.query.options(joinedload(WasteEntry.user))\
+        .filter(WasteEntry.id.in_(select(recent_ids.c.id)))
+
+def recent_entries_by_status(limits):
+    """Most recent entries for each status, e.g. {'new': 5}, fetched with one UNION ALL query.
+    
+    Entries come back grouped in the order of ``limits``, newest first, with
+    their user eager-loaded.
+    """
+    entries = recent_entries_query(limits).all()
+    
+    status_order = list(limits)
+    entries.sort(key=lambda e: e.disposal_date, reverse=True)
+    entries.sort(key=lambda e: status_order.index(e.status))
+    return entries
+
+# Statistics rollups
+# Rough CO2 savings per kg of recycled waste, by waste type
+CO2_SAVED_PER_KG = {
+    'recyclable': 0.6,  # Recyclable: 1 kg ≈ 0.6 kg CO2 saved
+    'organic': 0.3,     # Organic waste composting: 1 kg ≈ 0.3 kg CO2 saved
+    'hazardous': 0.8,   # Proper hazardous waste disposal: 1 kg ≈ 0.8 kg CO2 saved
+}
+DEFAULT_CO2_SAVED_PER_KG = 0.4  # Other waste: 1 kg ≈ 0.4 kg CO2 saved
+TREES_SAVED_PER_TONNE = 17  # Paper/plastic recycling saves trees
+
+# Snapshot of the WasteEntry fields that feed the rollups, taken before/after a write
+WasteEntryState = namedtuple('WasteEntryState',
+                             ['user_id', 'waste_type', 'disposal_date', 'status', 'recycled', 'weight_kg'])
+
+def waste_entry_state(entry):
+    """Snapshot a waste entry (must be flushed so defaults are populated)"""
+    return WasteEntryState(
+        user_id=entry.user_id,
+        waste_type=entry.waste_type,
+        disposal_date=entry.disposal_date,
+        status=entry.status or 'new',
+        recycled=bool(entry.recycled),
+        weight_kg=entry.weight_kg or 0
+    )
+
+def rollup_bucket(state):
+    """Rollup key (user_id, waste_type, month, week, status, recycled) for an entry state"""
+    week_start = state.disposal_date - timedelta(days=state.disposal_date.weekday())
+    return (state.user_id, state.waste_type, state.disposal_date.strftime('%Y-%m'),
+            week_start.strftime('%Y-%m-%d'), state.status, state.recycled)
+
+ROLLUP_BUCKET_COLUMNS = ['user_id', 'waste_type', 'month', 'week', 'status', 'recycled']
+
+# INSERT ... ON CONFLICT DO UPDATE constructs, per dialect
+UPSERT_INSERTS = {'sqlite': sqlite_insert, 'postgresql': postgresql_insert}
+
+def upsert_increment(model, key_columns, key, increments):
+    """Add ``increments`` to the row identified by ``key``, creating it if missing.
+    
+    A single INSERT ... ON CONFLICT DO UPDATE, so two writers creating the same
+    row at once both land instead of one failing on the unique constraint.
+    """
+    dialect = db.engine.dialect.name
+    if dialect not in UPSERT_INSERTS:
+        updated = model.query.filter_by(**key).update({
+            getattr(model, column): getattr(model, column) + change for column, change in increments.items()
+        }, synchronize_session=False)
+        if not updated:
+            db.session.add(model(**key, **increments))
+            db.session.flush()
+        return
     
-    elif any(word in message_lower for word in ['thank', 'thanks']):
-        return "You're welcome! Keep up the great work with waste management! 🌍"
+    table = model.__table__
+    statement = UPSERT_INSERTS[dialect](table).values(**key, **increments)
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={column: table.c[column] + statement.excluded[column] for column in increments}
+    ))
+
+def record_waste_changes(changes):
+    """Apply (before, after) WasteEntryState pairs to rollups, counters, achievements and goals.
+    
+    ``before`` is None for new entries and ``after`` is None for deleted ones.
+    Runs in the caller's transaction; the caller commits. Returns the counter
+    deltas per user.
+    """
+    deltas = {}
+    counter_deltas = {}
+    user_changes = {}
+    for before, after in changes:
+        user_changes.setdefault((before or after).user_id, []).append((before, after))
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            key = rollup_bucket(state)
+            count, weight = deltas.get(key, (0, 0.0))
+            deltas[key] = (count + sign, weight + sign * state.weight_kg)
+            
+            counter = counter_deltas.setdefault(state.user_id, dict.fromkeys(COUNTER_METRICS, 0))
+            counter['entry_count'] += sign
+            counter['total_weight'] += sign * state.weight_kg
+            if state.recycled:
+                counter['recycled_count'] += sign
+                counter['recycled_weight'] += sign * state.weight_kg
+    
+    for key, (count, weight) in deltas.items():
+        if count == 0 and weight == 0:
+            continue
+        user_id, waste_type, month, week, status, recycled = key
+        upsert_increment(UserWasteRollup, ROLLUP_BUCKET_COLUMNS, {
+            'user_id': user_id, 'waste_type': waste_type, 'month': month,
+            'week': week, 'status': status, 'recycled': recycled
+        }, {'entry_count': count, 'total_weight': weight})
+    
+    for user_id, delta in counter_deltas.items():
+        if not any(delta.values()):
+            continue
+        upsert_increment(UserWasteCounter, ['user_id'], {'user_id': user_id}, delta)
+        award_achievements(user_id, delta)
     
-    elif any(word in message_lower for word in ['environment', 'impact', 'carbon']):
-        return "Great question! Proper waste management significantly reduces environmental impact. Recycling helps reduce carbon emissions and saves resources. Track your waste to see your positive impact!"
+    for user_id, changes_for_user in user_changes.items():
+        advance_goals(user_id, changes_for_user)
     
-    else:
-        return "I'm here to help with waste management! You can ask me about recycling centers, pickup schedules, waste tracking, statistics, goals, or tips for proper waste disposal. What would you like to know?"
+    # Cached chatbot stats are dropped once this transaction commits
+    db.session.info.setdefault('chat_stats_changed', set()).update(counter_deltas)
+    return counter_deltas
 
-# Initialize database with sample data
-def init_db():
-    """Initialize database with sample data"""
-    db.create_all()
+def rebuild_user_counters():
+    """Recompute every user's running counters from waste entries"""
+    UserWasteCounter.query.delete(synchronize_session=False)
+    
+    weight = func.coalesce(WasteEntry.weight_kg, 0.0)
+    recycled = func.coalesce(WasteEntry.recycled, false())
+    db.session.execute(insert(UserWasteCounter).from_select([
+        'user_id', 'entry_count', 'total_weight', 'recycled_count', 'recycled_weight'
+    ], select(
+        WasteEntry.user_id,
+        func.count(WasteEntry.id),
+        func.sum(weight),
+        func.sum(case((recycled == True, 1), else_=0)),
+        func.sum(case((recycled == True, weight), else_=0.0))
+    ).group_by(WasteEntry.user_id)))
+    db.session.commit()
+    invalidate_chatbot_user_stats()
+
+def rebuild_waste_rollups(user_id=None):
+    """Recompute rollups from waste entries (all users, or one user)"""
+    rollups = UserWasteRollup.query
+    if user_id is not None:
+        rollups = rollups.filter_by(user_id=user_id)
+    rollups.delete(synchronize_session=False)
+    
+    # Aggregate entries into buckets in a single INSERT ... SELECT ... GROUP BY
+    buckets = (
+        WasteEntry.user_id,
+        WasteEntry.waste_type,
+        date_bucket('month', WasteEntry.disposal_date),
+        date_bucket('week', WasteEntry.disposal_date),
+        func.coalesce(WasteEntry.status, literal_column("'new'")),
+        func.coalesce(WasteEntry.recycled, false())
+    )
+    filters = {'user_id': user_id} if user_id is not None else {}
+    grouped = aggregate_waste_entries(*buckets, **filters)
     
-    # Add new columns if they don't exist (for existing databases)
-    # Using raw SQL for SQLite compatibility
-    try:
-        # Add is_admin column to user table
-        try:
-            db.session.execute(text('ALTER TABLE user ADD COLUMN is_admin BOOLEAN DEFAULT 0;'))
-            db.session.commit()
-        except Exception:
-            db.session.rollback()
-            # Column already exists, ignore
-            pass
+    db.session.execute(insert(UserWasteRollup).from_select([
+        'user_id', 'waste_type', 'month', 'week', 'status', 'recycled', 'entry_count', 'total_weight'
+    ], grouped))
+    db.session.commit()
+
+def load_waste_rollups(user_id):
+    """Fetch the non-empty rollup buckets for a user as plain rows"""
+    return db.session.query(
+        UserWasteRollup.waste_type,
+        UserWasteRollup.month,
+        UserWasteRollup.week,
+        UserWasteRollup.status,
+        UserWasteRollup.recycled,
+        UserWasteRollup.entry_count,
+        UserWasteRollup.total_weight
+    ).filter(
+        UserWasteRollup.user_id == user_id,
+        UserWasteRollup.entry_count > 0
+    ).all()
+
+def summarize_waste_rollups(rows):
+    """Fold rollup rows into the totals and breakdowns shown on the statistics pages"""
+    summary = {
+        'total_entries': 0,
+        'total_weight': 0,
+        'recycled_count': 0,
+        'recycled_weight': 0,
+        'waste_by_type': {},
+        'monthly_stats': {},
+        'weekly_stats': {},
+        'status_distribution': {
+            'new': 0,
+            'waiting': 0,
+            'disposed': 0,
+            'new_weight': 0,
+            'waiting_weight': 0,
+            'disposed_weight': 0
+        },
+        'co2_saved': 0,
+        'trees_saved': 0,
+        'potential_co2': 0,
+        'potential_trees': 0
+    }
+    
+    for waste_type, month, week, status, recycled, count, weight in rows:
+        summary['total_entries'] += count
+        summary['total_weight'] += weight
         
-        # Add status columns to waste_entry table
-        try:
-            db.session.execute(text('ALTER TABLE waste_entry ADD COLUMN status VARCHAR(20) DEFAULT "new";'))
-            db.session.commit()
-        except Exception:
-            db.session.rollback()
-            # Column already exists, ignore
-            pass
+        for group, key in (('waste_by_type', waste_type), ('monthly_stats', month), ('weekly_stats', week)):
+            stats = summary[group].setdefault(key, {'count': 0, 'weight': 0})
+            stats['count'] += count
+            stats['weight'] += weight
         
-        try:
-            db.session.execute(text('ALTER TABLE waste_entry ADD COLUMN status_updated_at DATETIME;'))
-            db.session.commit()
-        except Exception:
-            db.session.rollback()
-            pass
+        if status in ['new', 'waiting', 'disposed']:
+            summary['status_distribution'][status] += count
+            summary['status_distribution'][f'{status}_weight'] += weight
         
-        try:
-            db.session.execute(text('ALTER TABLE waste_entry ADD COLUMN status_updated_by INTEGER;'))
-            db.session.commit()
-        except Exception:
-            db.session.rollback()
-            pass
+        # Environmental impact (rough estimates)
+        if recycled:
+            summary['recycled_count'] += count
+            summary['recycled_weight'] += weight
+            summary['co2_saved'] += weight * CO2_SAVED_PER_KG.get(waste_type, DEFAULT_CO2_SAVED_PER_KG)
+            if waste_type == 'recyclable':
+                summary['trees_saved'] += (weight / 1000) * TREES_SAVED_PER_TONNE
+        elif waste_type == 'recyclable':
+            # Potential savings from recyclable waste not yet marked recycled
+            summary['potential_co2'] += weight * CO2_SAVED_PER_KG['recyclable']
+            summary['potential_trees'] += (weight / 1000) * TREES_SAVED_PER_TONNE
+    
+    return summary
+
+# Chatbot user stats
+CHAT_STATS_TTL = 30  # seconds
+
+_chat_stats = {}  # user_id -> (expires_at, stats)
+_chat_stats_lock = threading.Lock()
+
+def chatbot_user_stats(user_id):
+    """A user's entry totals for chat replies, read from their counter row and cached briefly"""
+    now = time.monotonic()
+    with _chat_stats_lock:
+        cached = _chat_stats.get(user_id)
+    if cached and cached[0] > now:
+        return cached[1]
+    
+    counter = db.session.get(UserWasteCounter, user_id)
+    stats = {
+        'total_entries': counter.entry_count if counter else 0,
+        'recycled_count': counter.recycled_count if counter else 0,
+        'total_weight': round(counter.total_weight, 2) if counter else 0
+    }
+    with _chat_stats_lock:
+        _chat_stats[user_id] = (now + CHAT_STATS_TTL, stats)
+    return stats
+
+def invalidate_chatbot_user_stats(user_ids=None):
+    """Drop cached stats for the given users, or for everyone"""
+    with _chat_stats_lock:
+        if user_ids is None:
+            _chat_stats.clear()
+        else:
+            for user_id in user_ids:
+                _chat_stats.pop(user_id, None)
+
+@event.listens_for(OrmSession, 'after_commit')
+def _invalidate_changed_chat_stats(session):
+    user_ids = session.info.pop('chat_stats_changed', None)
+    if user_ids:
+        invalidate_chatbot_user_stats(user_ids)
+
+@event.listens_for(OrmSession, 'after_rollback')
+def _discard_chat_stats_changes(session):
+    session.info.pop('chat_stats_changed', None)
+
+# Chatbot intents
+# Keywords match whole words; a trailing '*' also matches any word continuing the stem
+# (e.g. 'recycl*' matches recycle, recycled, recycling). Intents earlier in the
+# table win ties when two intents score the same number of keyword hits.
+ChatIntent = namedtuple('ChatIntent', ['name', 'keywords', 'needs_stats', 'respond'])
+
+def _recycle_reply(stats):
+    response = "I can help you find recycling centers! Check the 'Recycling Centers' page or tell me your location."
+    if stats.get('recycled_count', 0) > 0:
+        response += f" You've recycled {stats['recycled_count']} items so far! 🌱"
+    return response
+
+def _waste_reply(stats):
+    response = "You can track your waste disposal on the 'Track Waste' page. What type of waste do you need to dispose of?"
+    if stats.get('total_entries', 0) > 0:
+        response += f" You've tracked {stats['total_entries']} waste entries."
+    return response
+
+def _stats_reply(stats):
+    if stats:
+        return f"Here's your progress: {stats['total_entries']} waste entries tracked, {stats['recycled_count']} items recycled, {stats['total_weight']} kg total. Great job! 🎉"
+    return "Check your dashboard for detailed statistics and progress!"
+
+CHAT_INTENTS = [
+    ChatIntent('recycle', ['recycl*', 'center*', 'centre*'], True, _recycle_reply),
+    ChatIntent('pickup', ['pickup*', 'pick up', 'schedul*', 'collection*'], False,
+               lambda stats: "You can view pickup schedules on the 'Pickup Schedules' page. What area are you in? I can also remind you about upcoming pickups!"),
+    ChatIntent('waste', ['waste*', 'dispos*', 'trash', 'garbage'], True, _waste_reply),
+    ChatIntent('stats', ['stat', 'stats', 'statistic*', 'progress', 'how much'], True, _stats_reply),
+    ChatIntent('tips', ['tip', 'tips', 'segregat*', 'separat*'], False,
+               lambda stats: "Check out the 'Waste Tips' page for helpful information on waste segregation and disposal! I can also give you specific tips - just ask!"),
+    ChatIntent('goal', ['goal*', 'target*', 'challenge*'], False,
+               lambda stats: "You can set waste reduction goals on your dashboard! Try setting a goal to reduce waste or increase recycling. Would you like help setting one up?"),
+    ChatIntent('greeting', ['hello', 'hi', 'hey', 'greeting*'], False,
+               lambda stats: "Hello! I'm Ecotrack assistant. How can I help you with waste management today? I can help with tracking, finding centers, schedules, and tips!"),
+    ChatIntent('help', ['help', 'support', 'what can you'], False,
+               lambda stats: "I can help you with: finding recycling centers, checking pickup schedules, tracking waste, setting goals, viewing statistics, and providing waste management tips. What do you need?"),
+    ChatIntent('thanks', ['thank*'], False,
+               lambda stats: "You're welcome! Keep up the great work with waste management! 🌍"),
+    ChatIntent('environment', ['environment*', 'impact', 'carbon'], False,
+               lambda stats: "Great question! Proper waste management significantly reduces environmental impact. Recycling helps reduce carbon emissions and saves resources. Track your waste to see your positive impact!"),
+]
+
+CHAT_FALLBACK_REPLY = "I'm here to help with waste management! You can ask me about recycling centers, pickup schedules, waste tracking, statistics, goals, or tips for proper waste disposal. What would you like to know?"
+
+def _keyword_pattern(keyword):
+    if keyword.endswith('*'):
+        return re.escape(keyword[:-1]) + r'\w*'
+    # Phrases match with any run of whitespace between their words
+    return r'\s+'.join(re.escape(word) for word in keyword.split())
+
+def compile_intent_matcher(intents):
+    """One case-insensitive regex with a named group per intent, scanned once per message"""
+    groups = [f"(?P<{intent.name}>{'|'.join(_keyword_pattern(k) for k in intent.keywords)})"
+              for intent in intents]
+    return re.compile(r'\b(?:' + '|'.join(groups) + r')\b', re.IGNORECASE)
+
+INTENT_MATCHER = compile_intent_matcher(CHAT_INTENTS)
+INTENT_PRIORITY = {intent.name: position for position, intent in enumerate(CHAT_INTENTS)}
+INTENTS_BY_NAME = {intent.name: intent for intent in CHAT_INTENTS}
+
+def match_intents(message):
+    """Scored intents for a message: [(intent, hits)], best first"""
+    scores = {}
+    for match in INTENT_MATCHER.finditer(message):
+        scores[match.lastgroup] = scores.get(match.lastgroup, 0) + 1
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], INTENT_PRIORITY[item[0]]))
+    return [(INTENTS_BY_NAME[name], hits) for name, hits in ranked]
+
+@app.cli.command('bench-chat-intents')
+@click.option('--limit', default=10000, help='Number of recorded chat messages to use')
+@click.option('--repeat', default=5, help='Passes over the corpus (best is reported)')
+def bench_chat_intents_command(limit, repeat):
+    """Measure per-message intent matching cost over recorded ChatMessage texts"""
+    corpus = [message for (message,) in db.session.query(ChatMessage.message).limit(limit)]
+    if not corpus:
+        raise click.ClickException('No recorded chat messages to benchmark against')
+    
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for message in corpus:
+            match_intents(message)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    
+    matched = sum(1 for message in corpus if match_intents(message))
+    click.echo(f"{len(corpus)} messages, {matched} matched an intent")
+    click.echo(f"{best / len(corpus) * 1_000_000:.2f} µs per message ({len(corpus) / best:,.0f} messages/s)")
+
+def generate_chatbot_response(message, user_id=None):
+    """Generate enhanced chatbot response based on user message"""
+    intents = match_intents(message)
+    if not intents:
+        return CHAT_FALLBACK_REPLY
+    intent, _ = intents[0]
+    # Only the intents that quote the user's numbers pay for loading them
+    user_stats = chatbot_user_stats(user_id) if intent.needs_stats and user_id else {}
+    return intent.respond(user_stats)
+
+# Database maintenance
+def hot_path_queries(user_id=1):
+    """The queries the routes issue, built by the same helpers, keyed by a short description.
+    
+    Paginated queries are checked on a later page (with a sample keyset cursor),
+    since that adds the (timestamp, id) range condition to the plan. Search
+    pages are left out: a leading-wildcard LIKE can't use an index.
+    """
+    cursor = encode_cursor(datetime(2024, 1, 1), 1000)
+    entry_keys = (WasteEntry.disposal_date, WasteEntry.id)
+    users_query, user_count_query = admin_users_query()
+    return {
+        'dashboard recent entries': WasteEntry.query.filter_by(user_id=user_id)
+            .order_by(WasteEntry.disposal_date.desc()).limit(5),
+        'user status counters': waste_status_counters_query(user_id),
+        'track waste page': keyset_query(user_waste_entries_query(user_id, 'waiting'),
+                                         *entry_keys, TRACK_WASTE_PAGE_SIZE, cursor),
+        'api waste entries page': keyset_query(user_waste_entries_query(user_id),
+                                               *entry_keys, API_PAGE_SIZE, cursor),
+        'api waste entries by status page': keyset_query(user_waste_entries_query(user_id, 'new'),
+                                                         *entry_keys, API_PAGE_SIZE, cursor),
+        'statistics rollups': UserWasteRollup.query.filter_by(user_id=user_id),
+        'goals': WasteGoal.query.filter_by(user_id=user_id).order_by(WasteGoal.created_at.desc()),
+        'notifications page': Notification.query.filter_by(user_id=user_id)
+            .order_by(Notification.created_at.desc()).limit(50),
+        'unread notifications': Notification.query.filter_by(user_id=user_id, is_read=False)
+            .order_by(Notification.created_at.desc()).limit(10),
+        'achievement lookup': Achievement.query.filter_by(user_id=user_id, achievement_type='first_entry'),
+        'admin status counters': waste_status_counters_query(),
+        'admin recent by status': recent_entries_query(ADMIN_RECENT_ENTRIES),
+        'admin waste by type': waste_totals_by_type_query(),
+        'admin waste management page': keyset_query(admin_waste_entries_query(),
+                                                    *entry_keys, ADMIN_PAGE_SIZE, cursor),
+        'admin waste management by status page': keyset_query(admin_waste_entries_query(status='waiting'),
+                                                               *entry_keys, ADMIN_PAGE_SIZE, cursor),
+        'admin waste management by type page': keyset_query(admin_waste_entries_query(waste_type='organic'),
+                                                            *entry_keys, ADMIN_PAGE_SIZE, cursor),
+        'admin waste count estimate': waste_entry_estimate_query(),
+        'admin waste count estimate by status': waste_entry_estimate_query(status='waiting'),
+        'admin waste count estimate by type': waste_entry_estimate_query(waste_type='organic'),
+        'admin users page': keyset_query(users_query, User.created_at, User.id, ADMIN_PAGE_SIZE, cursor),
+        'admin user count': user_count_query,
+    }
+
+@app.cli.command('check-query-plans')
+def check_query_plans_command():
+    """Run EXPLAIN QUERY PLAN on the hot route queries and fail on table scans (SQLite only)"""
+    if db.engine.dialect.name != 'sqlite':
+        raise click.ClickException('EXPLAIN QUERY PLAN is only available on SQLite')
+    
+    failures = []
+    for name, query in hot_path_queries().items():
+        sql = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True})
+        plan = [row[3] for row in db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+        # Scanning a subquery's own (already limited) rows is fine, only tables matter
+        subqueries = {step.split()[-1] for step in plan if step.startswith(('CO-ROUTINE', 'MATERIALIZE'))}
+        # A plain "SCAN <table>" or a temp sort means the query isn't served by an index
+        bad_steps = [step for step in plan
+                     if (step.startswith('SCAN') and 'USING' not in step and step.split()[1] not in subqueries)
+                     or 'TEMP B-TREE' in step]
+        click.echo(f"{'FAIL' if bad_steps else 'ok  '}  {name}: {'; '.join(plan)}")
+        if bad_steps:
+            failures.append(name)
+    
+    if failures:
+        raise click.ClickException(f"{len(failures)} queries not using an index: {', '.join(failures)}")
+
+# PRAGMA reads return these as numbers
+SQLITE_PRAGMA_NAMES = {
+    'synchronous': {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'},
+    'temp_store': {0: 'DEFAULT', 1: 'FILE', 2: 'MEMORY'},
+}
+
+def database_settings():
+    """Effective engine settings: backend, pool status and, on SQLite, each configured pragma.
+    
+    Pragmas are returned as {name: (configured, effective)}.
+    """
+    settings = {'backend': db.engine.dialect.name, 'pool': db.engine.pool.status(), 'pragmas': {}}
+    if db.engine.dialect.name == 'sqlite':
+        with db.engine.connect() as connection:
+            for name, configured in app.config['SQLITE_PRAGMAS'].items():
+                effective = connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+                effective = SQLITE_PRAGMA_NAMES.get(name, {}).get(effective, effective)
+                settings['pragmas'][name] = (configured, effective)
+    return settings
+
+def report_database_settings(echo=print):
+    """Print the effective settings; returns the pragmas that differ from the configuration"""
+    settings = database_settings()
+    echo(f"Database backend: {settings['backend']} ({settings['pool']})")
+    mismatched = []
+    for name, (configured, effective) in settings['pragmas'].items():
+        matches = str(configured).upper() == str(effective).upper()
+        echo(f"{'ok  ' if matches else 'WARN'}  PRAGMA {name} = {effective} (configured {configured})")
+        if not matches:
+            mismatched.append(name)
+    return mismatched
+
+@app.cli.command('check-db-settings')
+def check_db_settings_command():
+    """Report the effective engine settings and fail if a SQLite pragma didn't take effect"""
+    mismatched = report_database_settings(click.echo)
+    if mismatched:
+        raise click.ClickException(f"Pragmas not in effect: {', '.join(mismatched)}")
+
+@app.cli.command('bench-db-concurrency')
+@click.option('--readers', default=8, help='Concurrent reader threads')
+@click.option('--writers', default=2, help='Concurrent writer threads')
+@click.option('--seconds', default=5.0, help='Duration of each run')
+def bench_db_concurrency_command(readers, writers, seconds):
+    """Compare concurrent read/write throughput of default SQLite settings against the tuned profile.
+    
+    Each run uses a fresh scratch database, so the application data is untouched.
+    """
+    def run(label, tuned):
+        scratch_dir = tempfile.mkdtemp(prefix='ecotrack-bench-')
+        uri = f"sqlite:///{os.path.join(scratch_dir, 'bench.db')}"
+        engine = create_engine(uri, **(database_engine_options(uri) if tuned else {}))
+        if tuned:
+            event.listen(engine, 'connect', apply_sqlite_pragmas)
+        with engine.begin() as connection:
+            connection.exec_driver_sql('CREATE TABLE bench (id INTEGER PRIMARY KEY, user_id INTEGER, weight REAL)')
+            connection.exec_driver_sql('CREATE INDEX ix_bench_user ON bench (user_id)')
+            connection.execute(text('INSERT INTO bench (user_id, weight) VALUES (:user_id, :weight)'),
+                               [{'user_id': i % 100, 'weight': float(i % 7)} for i in range(10000)])
         
-        try:
-            db.session.execute(text('ALTER TABLE recycling_center ADD COLUMN email TEXT;'))
-            db.session.commit()
-        except Exception:
-            db.session.rollback()
-            # If column already exists, ignore the error
-            pass
-    except Exception as e:
-        print(f"Database migration note: {e}")
-        # Continue anyway - columns may already exist
+        counts = {'reads': 0, 'writes': 0, 'errors': 0}
+        counts_lock = threading.Lock()
+        deadline = time.monotonic() + seconds
+        
+        def worker(kind, seed):
+            done = errors = 0
+            statement = (text('SELECT count(*), sum(weight) FROM bench WHERE user_id = :user_id') if kind == 'reads'
+                         else text('INSERT INTO bench (user_id, weight) VALUES (:user_id, 1.0)'))
+            while time.monotonic() < deadline:
+                seed = (seed * 31 + 7) % 100
+                try:
+                    with engine.begin() as connection:
+                        connection.execute(statement, {'user_id': seed})
+                    done += 1
+                except Exception:
+                    errors += 1  # typically "database is locked"
+            with counts_lock:
+                counts[kind] += done
+                counts['errors'] += errors
+        
+        threads = ([threading.Thread(target=worker, args=('reads', i)) for i in range(readers)] +
+                   [threading.Thread(target=worker, args=('writes', i)) for i in range(writers)])
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+        
+        click.echo(f"{label:8} {counts['reads'] / seconds:10,.0f} reads/s {counts['writes'] / seconds:8,.0f} writes/s"
+                   f" {counts['errors']:6} errors")
     
-    # Update existing waste entries to have 'new' status if they don't have one
-    try:
-        entries_without_status = WasteEntry.query.filter(WasteEntry.status == None).all()
-        for entry in entries_without_status:
-            entry.status = 'new'
-        db.session.commit()
-    except Exception:
-        pass
+    click.echo(f"{readers} readers, {writers} writers, {seconds:g}s per run")
+    run('default', tuned=False)
+    run('tuned', tuned=True)
+
+# Schema migrations
+# Applied in order by `flask db-upgrade` and recorded in schema_version, so each
+# runs once per database. Append new migrations; never renumber applied ones.
+# Tables for new models are created by create_all() before pending migrations run.
+Migration = namedtuple('Migration', ['version', 'description', 'apply'])
+
+# Columns added after the first release, missing from databases created before them
+LEGACY_COLUMNS = [
+    ('user', 'is_admin', 'BOOLEAN DEFAULT FALSE'),
+    ('waste_entry', 'status', "VARCHAR(20) DEFAULT 'new'"),
+    ('waste_entry', 'status_updated_at', 'TIMESTAMP'),
+    ('waste_entry', 'status_updated_by', 'INTEGER'),
+    ('recycling_center', 'email', 'TEXT'),
+]
+
+def add_legacy_columns():
+    inspector = inspect(db.engine)
+    quote = db.engine.dialect.identifier_preparer.quote_identifier
+    for table, column, definition in LEGACY_COLUMNS:
+        if column not in {existing['name'] for existing in inspector.get_columns(table)}:
+            db.session.execute(text(f'ALTER TABLE {quote(table)} ADD COLUMN {column} {definition}'))
+    db.session.commit()
+
+# Indexes each migration adds, spelled out so a version means the same schema whenever it's applied
+HOT_PATH_INDEXES = [
+    ('waste_entry', 'ix_waste_entry_user_status_date', ('user_id', 'status', 'disposal_date')),
+    ('waste_entry', 'ix_waste_entry_user_date', ('user_id', 'disposal_date')),
+    ('waste_entry', 'ix_waste_entry_status_date', ('status', 'disposal_date')),
+    ('waste_entry', 'ix_waste_entry_type_date', ('waste_type', 'disposal_date')),
+    ('waste_entry', 'ix_waste_entry_disposal_date', ('disposal_date',)),
+    ('waste_goal', 'ix_waste_goal_user_created', ('user_id', 'created_at')),
+    ('notification', 'ix_notification_user_read_created', ('user_id', 'is_read', 'created_at')),
+    ('notification', 'ix_notification_user_created', ('user_id', 'created_at')),
+    ('achievement', 'ix_achievement_user_type', ('user_id', 'achievement_type')),
+    ('user', 'ix_user_created_at', ('created_at',)),
+    ('recycling_center', 'ix_recycling_center_active_lat_lng', ('is_active', 'latitude', 'longitude')),
+]
+
+ROLLUP_TOTAL_INDEXES = [
+    ('user_waste_rollup', 'ix_user_waste_rollup_status_counts', ('status', 'recycled', 'entry_count')),
+    ('user_waste_rollup', 'ix_user_waste_rollup_user_status_counts', ('user_id', 'status', 'recycled', 'entry_count')),
+    ('user_waste_rollup', 'ix_user_waste_rollup_type_totals', ('waste_type', 'entry_count', 'total_weight')),
+]
+
+def create_indexes(indexes):
+    """Create each (table, name, columns) index unless one with that name exists"""
+    quote = db.engine.dialect.identifier_preparer.quote_identifier
+    for table, name, columns in indexes:
+        column_list = ', '.join(quote(column) for column in columns)
+        db.session.execute(text(f'CREATE INDEX IF NOT EXISTS {quote(name)} ON {quote(table)} ({column_list})'))
+    db.session.commit()
+
+def create_hot_path_indexes():
+    create_indexes(HOT_PATH_INDEXES)
+
+def create_rollup_total_indexes():
+    create_indexes(ROLLUP_TOTAL_INDEXES)
+
+def backfill_waste_status():
+    WasteEntry.query.filter(WasteEntry.status.is_(None)).update(
+        {WasteEntry.status: 'new'}, synchronize_session=False
+    )
+    db.session.commit()
+
+def backfill_rollups_and_counters():
+    if WasteEntry.query.first() is None:
+        return
+    if UserWasteRollup.query.first() is None:
+        rebuild_waste_rollups()
+    if UserWasteCounter.query.first() is None:
+        rebuild_user_counters()
+        reconcile_achievements()
+
+def seed_sample_data():
     # Add sample recycling centers for Nepal (Kathmandu area)
     if RecyclingCenter.query.count() == 0:
         sample_centers = [
@@ -1392,8 +3450,51 @@ def init_db():
         
         db.session.commit()
 
+MIGRATIONS = [
+    Migration(1, 'Add columns introduced after the first release', add_legacy_columns),
+    Migration(2, "Backfill missing waste entry statuses as 'new'", backfill_waste_status),
+    Migration(3, 'Create indexes missing from older databases', create_hot_path_indexes),
+    Migration(4, 'Backfill statistics rollups, user counters and achievements', backfill_rollups_and_counters),
+    Migration(5, 'Add sample recycling centers and pickup schedules', seed_sample_data),
+    Migration(6, 'Create covering indexes for the dashboard rollup totals', create_rollup_total_indexes),
+]
+
+def current_schema_version():
+    """Highest applied migration, or 0 for a database without a schema_version table"""
+    if not inspect(db.engine).has_table(SchemaVersion.__tablename__):
+        return 0
+    return db.session.query(func.max(SchemaVersion.version)).scalar() or 0
+
+def pending_migrations():
+    current = current_schema_version()
+    return [migration for migration in MIGRATIONS if migration.version > current]
+
+def run_migrations(echo=print):
+    """Create missing tables and apply pending migrations in order; returns the versions applied"""
+    pending = pending_migrations()
+    if not pending:
+        return []
+    
+    db.create_all()
+    for migration in pending:
+        echo(f"Applying migration {migration.version}: {migration.description}")
+        migration.apply()
+        db.session.add(SchemaVersion(version=migration.version, description=migration.description))
+        db.session.commit()
+    return [migration.version for migration in pending]
+
+@app.cli.command('db-upgrade')
+def db_upgrade_command():
+    """Apply pending schema migrations"""
+    applied = run_migrations(click.echo)
+    click.echo(f"Schema is at version {current_schema_version()}{'' if applied else ' (already up to date)'}")
+
 if __name__ == '__main__':
     with app.app_context():
-        init_db()
+        # Migrations run once per deploy through `flask db-upgrade`, never on server start
+        if pending_migrations():
+            raise SystemExit(f"Database schema is at version {current_schema_version()}, "
+                             f"this code needs {MIGRATIONS[-1].version}: run `flask --app app db-upgrade` first")
+        report_database_settings()
     socketio.run(app, debug=True, host='0.0.0.0', port=5000)
 
@@ -1,6 +1,8 @@
 // Socket.IO connection
 let socket;
 let isConnected = false;
+let unreadNotifications = 0;
+let notificationPollTimer = null;
 
 // Initialize socket connection if user is authenticated
 document.addEventListener('DOMContentLoaded', function() {
@@ -18,6 +20,13 @@ document.addEventListener('DOMContentLoaded', function() {
             console.log('Connected to server');
             isConnected = true;
             // Don't add welcome message here, wait for server confirmation
+            
+            // Notifications are pushed while connected; fetch the backlog on (re)connect
+            checkNotifications();
+        });
+        
+        socket.on('notification', function(data) {
+            setNotificationBadge(unreadNotifications + 1);
         });
         
         socket.on('connected', function(data) {
@@ -47,6 +56,13 @@ document.addEventListener('DOMContentLoaded', function() {
             console.log('Reconnected to server');
             isConnected = true;
         });
+        
+        // If the socket gives up reconnecting, fall back to slow polling
+        socket.io.on('reconnect_failed', function() {
+            if (!notificationPollTimer) {
+                notificationPollTimer = setInterval(checkNotifications, 60000);
+            }
+        });
     }
 });
 
@@ -81,18 +97,8 @@ function sendChatMessage() {
     addChatMessage('user', message);
     input.value = '';
     
-    // Send to server
-    socket.emit('chat_message', { 
-        message: message,
-        user_id: getUserIdFromPage() // Try to get user ID from page
-    });
-}
-
-function getUserIdFromPage() {
-    // Try to extract user ID from page if available
-    // This is a fallback - the server should get it from session
-    const userData = document.querySelector('[data-user-id]');
-    return userData ? userData.getAttribute('data-user-id') : null;
+    // Send to server (the server knows the user from the authenticated connection)
+    socket.emit('chat_message', { message: message });
 }
 
 function handleChatKeyPress(event) {
@@ -122,30 +128,27 @@ document.addEventListener('DOMContentLoaded', function() {
             }, 300);
         }, 5000);
     });
-    
-    // Check for notifications
-    checkNotifications();
-    
-    // Check notifications every 30 seconds
-    setInterval(checkNotifications, 30000);
 });
 
 // Check for unread notifications
 function checkNotifications() {
     fetch('/api/notifications')
         .then(response => response.json())
-        .then(data => {
-            const badge = document.getElementById('notificationBadge');
-            if (badge && data.length > 0) {
-                badge.style.display = 'inline-block';
-                badge.textContent = data.length > 9 ? '9+' : data.length;
-            } else if (badge) {
-                badge.style.display = 'none';
-            }
-        })
+        .then(data => setNotificationBadge(data.length))
         .catch(error => console.error('Error checking notifications:', error));
 }
 
+function setNotificationBadge(count) {
+    unreadNotifications = count;
+    const badge = document.getElementById('notificationBadge');
+    if (badge && count > 0) {
+        badge.style.display = 'inline-block';
+        badge.textContent = count > 9 ? '9+' : count;
+    } else if (badge) {
+        badge.style.display = 'none';
+    }
+}
+
 // Mobile menu toggle
 function toggleMobileMenu() {
     const navMenu = document.getElementById('navMenu');
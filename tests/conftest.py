@@ -0,0 +1,48 @@
+import os
+import sqlite3
+import sys
+import tempfile
+
+import pytest
+
+# app.py reads its configuration at import time, so point it at scratch databases first.
+# Two SQLite files stand in for a primary and a (never replicated) read replica.
+_db_dir = tempfile.mkdtemp(prefix='ecotrack-tests-')
+PRIMARY_PATH = os.path.join(_db_dir, 'primary.db')
+REPLICA_PATH = os.path.join(_db_dir, 'replica.db')
+os.environ['DATABASE_URL'] = f"sqlite:///{PRIMARY_PATH}"
+os.environ['DATABASE_REPLICA_URL'] = f"sqlite:///{REPLICA_PATH}"
+os.environ['CHAT_PERSISTENCE_MODE'] = 'sync'
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def replicate():
+    """Copy the primary into the replica, standing in for replication catching up"""
+    with sqlite3.connect(PRIMARY_PATH) as primary, sqlite3.connect(REPLICA_PATH) as replica:
+        primary.backup(replica)
+
+
+@pytest.fixture(scope='session')
+def database():
+    """The app's primary database with the schema and sample data applied, replicated once"""
+    import app as ecotrack
+    with ecotrack.app.app_context():
+        ecotrack.run_migrations(echo=lambda message: None)
+    replicate()
+    return ecotrack.db
+
+
+@pytest.fixture
+def make_user(database):
+    import app as ecotrack
+    from werkzeug.security import generate_password_hash
+
+    def make_user(username, password='secret', **fields):
+        with ecotrack.app.app_context():
+            user = ecotrack.User(username=username, email=f'{username}@example.com',
+                                 password_hash=generate_password_hash(password), **fields)
+            database.session.add(user)
+            database.session.commit()
+            return user.id
+    return make_user
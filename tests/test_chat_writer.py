@@ -0,0 +1,45 @@
+import time
+
+from app import ChatMessage, ChatMessageWriter, app
+
+
+def stored_messages(database, user_id):
+    with app.app_context():
+        return sorted(m for (m,) in database.session.query(ChatMessage.message).filter_by(user_id=user_id))
+
+
+def test_write_behind_batches_rows(database, make_user):
+    user_id = make_user('batcher')
+    writer = ChatMessageWriter(batch_size=3, interval=5)
+    for i in range(3):
+        writer.record(user_id, f'message {i}', 'reply')
+
+    # A full batch is committed without waiting for the interval
+    for _ in range(50):
+        if len(stored_messages(database, user_id)) == 3:
+            break
+        time.sleep(0.05)
+    assert stored_messages(database, user_id) == ['message 0', 'message 1', 'message 2']
+    writer.close()
+
+
+def test_close_flushes_rows_held_by_the_worker(database, make_user):
+    user_id = make_user('closer')
+    writer = ChatMessageWriter(batch_size=100, interval=30)
+    for i in range(3):
+        writer.record(user_id, f'message {i}', 'reply')
+    time.sleep(0.2)  # the worker has taken the rows and is waiting out its interval
+    assert writer._queue.empty()
+    assert stored_messages(database, user_id) == []
+
+    writer.close(timeout=5)
+    assert stored_messages(database, user_id) == ['message 0', 'message 1', 'message 2']
+    assert not writer._thread.is_alive()
+
+
+def test_sync_mode_commits_before_returning(database, make_user):
+    user_id = make_user('syncer')
+    writer = ChatMessageWriter(mode='sync')
+    with app.app_context():
+        writer.record(user_id, 'hello', 'reply')
+    assert stored_messages(database, user_id) == ['hello']
@@ -0,0 +1,16 @@
+import app as ecotrack
+from app import app
+
+
+def test_parquet_link_only_shown_with_pyarrow(database, make_user, monkeypatch):
+    make_user('exporter')
+    client = app.test_client()
+    client.post('/login', data={'username': 'exporter', 'password': 'secret'})
+
+    monkeypatch.setattr(ecotrack, 'pa', None)
+    page = client.get('/statistics').get_data(as_text=True)
+    assert 'format=ndjson' in page
+    assert 'format=parquet' not in page
+
+    monkeypatch.setattr(ecotrack, 'pa', object())
+    assert 'format=parquet' in client.get('/statistics').get_data(as_text=True)
@@ -0,0 +1,80 @@
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import app as ecotrack
+from app import (GEOCODE_MISS_TTL, GeocodeCache, NominatimProvider, OutboundHTTPClient, User, app,
+                 geocode_address, geocoding_worker, set_geocoding_provider)
+
+KNOWN_ADDRESSES = {'thamel kathmandu nepal': (27.7154, 85.3123)}
+
+
+class FakeNominatim(BaseHTTPRequestHandler):
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)['q'][0]
+        self.server.queries.append(query)
+        match = KNOWN_ADDRESSES.get(ecotrack.normalize_address(query))
+        results = [{'lat': str(match[0]), 'lon': str(match[1])}] if match else []
+        body = json.dumps(results).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def geocoder(request):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeNominatim)
+    server.queries = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = OutboundHTTPClient(f'test-{request.node.name}', rate_per_second=1000, burst=10)
+    previous = ecotrack.geocoding_provider
+    set_geocoding_provider(NominatimProvider(f'http://127.0.0.1:{server.server_port}/search', client=client))
+    yield server
+    set_geocoding_provider(previous)
+    server.shutdown()
+    server.server_close()
+
+
+def test_registration_fills_in_coordinates_from_the_cache(database, geocoder):
+    client = app.test_client()
+    for username in ('mapped', 'mapped-again'):
+        client.post('/register', data={'username': username, 'email': f'{username}@example.com',
+                                       'password': 'secret', 'address': 'Thamel', 'city': 'Kathmandu'})
+    geocoding_worker._queue.join()
+
+    # The second registration is served from the cache without asking the provider
+    assert geocoder.queries == ['Thamel, Kathmandu, Nepal']
+    with app.app_context():
+        for username in ('mapped', 'mapped-again'):
+            user = User.query.filter_by(username=username).one()
+            assert (user.latitude, user.longitude) == KNOWN_ADDRESSES['thamel kathmandu nepal']
+
+
+def test_not_found_results_expire(database, geocoder):
+    with app.app_context():
+        assert geocode_address('Nowhere Street, Atlantis') == (None, None)
+        assert geocode_address('nowhere street atlantis') == (None, None)
+        assert len(geocoder.queries) == 1
+
+        cached = GeocodeCache.query.filter_by(address_key='nowhere street atlantis').one()
+        cached.updated_at = datetime.utcnow() - GEOCODE_MISS_TTL
+        ecotrack.db.session.commit()
+
+        KNOWN_ADDRESSES['nowhere street atlantis'] = (1.0, 2.0)
+        try:
+            assert geocode_address('Nowhere Street, Atlantis') == (1.0, 2.0)
+        finally:
+            del KNOWN_ADDRESSES['nowhere street atlantis']
+        assert len(geocoder.queries) == 2
+        assert geocode_address('Nowhere Street, Atlantis') == (1.0, 2.0)
+        assert len(geocoder.queries) == 2
@@ -0,0 +1,18 @@
+from sqlalchemy import inspect
+
+from app import HOT_PATH_INDEXES, MIGRATIONS, ROLLUP_TOTAL_INDEXES, app, current_schema_version, db
+
+
+def test_every_model_index_is_created_by_a_migration():
+    declared = {(table.name, index.name, tuple(column.name for column in index.columns))
+                for table in db.metadata.sorted_tables for index in table.indexes}
+    assert declared == set(HOT_PATH_INDEXES) | set(ROLLUP_TOTAL_INDEXES)
+
+
+def test_migrated_database_has_every_index(database):
+    with app.app_context():
+        assert current_schema_version() == MIGRATIONS[-1].version
+        inspector = inspect(database.engine)
+        for table, name, columns in HOT_PATH_INDEXES + ROLLUP_TOTAL_INDEXES:
+            indexes = {index['name']: tuple(index['column_names']) for index in inspector.get_indexes(table)}
+            assert indexes.get(name) == columns
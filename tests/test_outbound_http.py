@@ -0,0 +1,123 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app import CircuitOpenError, OutboundHTTPClient, RateLimitedError
+
+
+class FakeService(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, so connection reuse is observable
+
+    def do_GET(self):
+        self.server.connections.add(self.client_address)
+        self.server.hits += 1
+        body = b'[]'
+        self.send_response(self.server.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def service():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeService)
+    server.connections = set()
+    server.hits = 0
+    server.status = 200
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f'http://127.0.0.1:{server.server_port}/search'
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(request, **options):
+    return OutboundHTTPClient(f'test-{request.node.name}', **options)
+
+
+def test_requests_reuse_one_pooled_connection(request, service):
+    client = make_client(request, rate_per_second=1000, burst=10)
+    for _ in range(5):
+        assert client.get(service.url).status_code == 200
+
+    assert service.hits == 5
+    assert len(service.connections) == 1
+    assert client.metrics()['requests'] == 5
+
+
+def test_rate_limiter_spaces_calls(request, service):
+    client = make_client(request, rate_per_second=10, burst=1)
+    start = time.monotonic()
+    for _ in range(4):
+        client.get(service.url)
+    # The first call uses the initial token; the other three wait ~0.1s each
+    assert time.monotonic() - start >= 0.25
+
+
+def test_rate_limit_wait_exceeded(request, service):
+    client = make_client(request, rate_per_second=1, burst=1, rate_limit_wait=0)
+    client.get(service.url)
+    with pytest.raises(RateLimitedError):
+        client.get(service.url)
+    assert service.hits == 1
+    assert client.metrics()['rate_limited'] == 1
+
+
+def test_breaker_opens_half_opens_and_closes(request, service):
+    client = make_client(request, rate_per_second=1000, burst=10, failure_threshold=2, reset_timeout=0.2)
+    service.status = 500
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            client.get(service.url)
+    assert client.breaker.state == 'open'
+
+    with pytest.raises(CircuitOpenError):
+        client.get(service.url)
+    assert service.hits == 2
+
+    time.sleep(0.25)
+    service.status = 200
+    assert client.get(service.url).status_code == 200
+    assert client.breaker.state == 'closed'
+    assert client.metrics()['rejected_open_circuit'] == 1
+
+
+def test_failed_half_open_trial_reopens(request, service):
+    client = make_client(request, rate_per_second=1000, burst=10, failure_threshold=1, reset_timeout=0.2)
+    service.status = 500
+    with pytest.raises(requests.HTTPError):
+        client.get(service.url)
+
+    time.sleep(0.25)
+    with pytest.raises(requests.HTTPError):
+        client.get(service.url)
+    assert client.breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        client.get(service.url)
+
+
+def test_rate_limited_call_does_not_strand_half_open_circuit(request, service):
+    client = make_client(request, rate_per_second=10, burst=1, rate_limit_wait=0,
+                         failure_threshold=1, reset_timeout=0.2)
+    service.status = 500
+    with pytest.raises(requests.HTTPError):
+        client.get(service.url)
+
+    time.sleep(0.25)
+    client.rate_limiter.acquire()  # use up the token so the next call is rate limited
+    with pytest.raises(RateLimitedError):
+        client.get(service.url)
+    assert client.breaker.state == 'open'
+
+    time.sleep(0.15)
+    service.status = 200
+    assert client.get(service.url).status_code == 200
+    assert client.breaker.state == 'closed'
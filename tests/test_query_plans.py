@@ -0,0 +1,32 @@
+from app import (WasteEntry, app, record_waste_changes, waste_entry_state, waste_status_counters,
+                 waste_totals_by_type_query)
+
+
+def test_hot_path_queries_use_indexes(database):
+    result = app.test_cli_runner().invoke(args=['check-query-plans'])
+    assert result.exit_code == 0, result.output
+    assert 'admin status counters' in result.output
+    assert 'admin users page' in result.output
+
+
+def test_dashboard_counters_come_from_the_rollups(database, make_user):
+    user_id = make_user('counted')
+    with app.app_context():
+        before = waste_status_counters()
+        for status, waste_type, recycled in (('new', 'organic', False), ('waiting', 'organic', True),
+                                             ('disposed', 'hazardous', False)):
+            entry = WasteEntry(user_id=user_id, waste_type=waste_type, weight_kg=2.0,
+                               recycled=recycled, status=status)
+            database.session.add(entry)
+            database.session.flush()
+            record_waste_changes([(None, waste_entry_state(entry))])
+        database.session.commit()
+
+        assert waste_status_counters(user_id) == {'total': 3, 'recycled': 1, 'new': 1, 'waiting': 1, 'disposed': 1}
+        after = waste_status_counters()
+        assert {key: after[key] - before[key] for key in after} == \
+            {'total': 3, 'recycled': 1, 'new': 1, 'waiting': 1, 'disposed': 1}
+
+        by_type = {waste_type: (count, weight) for waste_type, count, weight in waste_totals_by_type_query()}
+        expected = database.session.query(WasteEntry.waste_type).filter_by(waste_type='organic').count()
+        assert by_type['organic'][0] == expected
@@ -0,0 +1,104 @@
+import random
+
+import app as ecotrack
+from app import RecyclingCenterIndex, app, calculate_distance
+
+
+def build(index):
+    with app.app_context():
+        index.build()
+
+
+def brute_force(lat, lng):
+    with app.app_context():
+        rows = ecotrack.RecyclingCenter.query.filter_by(is_active=True).all()
+        return sorted((calculate_distance(lat, lng, c.latitude, c.longitude), c.id) for c in rows)
+
+
+def test_index_answers_until_invalidated(database):
+    index = RecyclingCenterIndex()
+    build(index)
+    assert index.within_radius(27.70, 85.30, 10) is not None
+    index.invalidate()
+    assert index.within_radius(27.70, 85.30, 10) is None
+    assert index.nearest(27.70, 85.30, 1) is None
+
+
+def test_index_expires_after_ttl(database):
+    index = RecyclingCenterIndex(ttl=0)
+    build(index)
+    assert index.within_radius(27.70, 85.30, 10) is None
+
+
+def test_build_interrupted_by_invalidation_is_discarded(database, monkeypatch):
+    index = RecyclingCenterIndex()
+    cell = RecyclingCenterIndex._cell
+
+    def invalidate_mid_build(self, lat, lng):
+        index.invalidate()  # a commit lands after the rows were read
+        return cell(self, lat, lng)
+
+    monkeypatch.setattr(RecyclingCenterIndex, '_cell', invalidate_mid_build)
+    build(index)
+    monkeypatch.undo()
+    assert index.within_radius(27.70, 85.30, 10) is None
+
+
+def test_nearest_matches_brute_force(database):
+    index = RecyclingCenterIndex()
+    build(index)
+    rng = random.Random(7)
+    for _ in range(20):
+        lat, lng = rng.uniform(27.5, 27.9), rng.uniform(85.1, 85.5)
+        expected = brute_force(lat, lng)
+        for k in (1, 2, 3):
+            got = index.nearest(lat, lng, k)
+            assert [center_id for _, center_id in got] == [center_id for _, center_id in expected[:k]]
+
+
+def test_api_returns_k_nearest_centers(database, make_user):
+    make_user('finder')
+    client = app.test_client()
+    client.post('/login', data={'username': 'finder', 'password': 'secret'})
+    lat, lng = 27.69, 85.34
+
+    response = client.get(f'/api/recycling-centers?lat={lat}&lng={lng}&nearest=2')
+    assert response.status_code == 200
+    expected = [center_id for _, center_id in brute_force(lat, lng)[:2]]
+    assert [center['id'] for center in response.get_json()] == expected
+
+
+def test_nearest_from_far_outside_the_grid(database):
+    index = RecyclingCenterIndex()
+    build(index)
+    for lat, lng in ((-20, 20), (10, 70), (89.9, -179.9), (-89.9, 179.9), (0, 0)):
+        expected = brute_force(lat, lng)
+        got = index.nearest(lat, lng, 3)
+        assert [center_id for _, center_id in got] == [center_id for _, center_id in expected[:3]]
+
+
+def test_nearest_over_a_spread_out_grid_matches_brute_force():
+    index = RecyclingCenterIndex(cell_size=0.5)
+    rng = random.Random(11)
+    centers = [(i, rng.uniform(-60, 60), rng.uniform(-170, 170)) for i in range(400)]
+    cells = {}
+    for center in centers:
+        cells.setdefault(index._cell(center[1], center[2]), []).append(center)
+    rows, cols = [row for row, _ in cells], [col for _, col in cells]
+    index._cells, index._bounds = cells, (min(rows), max(rows), min(cols), max(cols))
+    index._center_count, index._expires_at = len(centers), float('inf')
+
+    for _ in range(30):
+        lat, lng = rng.uniform(-90, 90), rng.uniform(-180, 180)
+        expected = sorted((calculate_distance(lat, lng, c_lat, c_lng), i) for i, c_lat, c_lng in centers)
+        got = index.nearest(lat, lng, 5)
+        assert [center_id for _, center_id in got] == [center_id for _, center_id in expected[:5]]
+
+
+def test_api_rejects_out_of_range_coordinates(database, make_user):
+    make_user('wanderer')
+    client = app.test_client()
+    client.post('/login', data={'username': 'wanderer', 'password': 'secret'})
+    assert client.get('/api/recycling-centers?lat=91&lng=85&nearest=1').status_code == 400
+    assert client.get('/api/recycling-centers?lat=27&lng=-181&nearest=1').status_code == 400
+    assert client.get('/api/recycling-centers?lat=27.7&lng=85.3&nearest=1').status_code == 200
@@ -0,0 +1,75 @@
+import sqlite3
+
+import pytest
+
+from app import WasteEntry, app, db
+from conftest import PRIMARY_PATH, REPLICA_PATH, replicate
+
+
+def entry_descriptions(path, user_id):
+    with sqlite3.connect(path) as connection:
+        rows = connection.execute('SELECT description FROM waste_entry WHERE user_id = ?', (user_id,))
+        return sorted(description for (description,) in rows)
+
+
+def api_descriptions(client):
+    response = client.get('/api/waste-entries')
+    assert response.status_code == 200
+    return sorted(entry['description'] for entry in response.get_json()['entries'])
+
+
+@pytest.fixture
+def client_for(make_user):
+    def client_for(username):
+        user_id = make_user(username)
+        replicate()
+        client = app.test_client()
+        client.post('/login', data={'username': username, 'password': 'secret'})
+        return client, user_id
+    return client_for
+
+
+def test_read_only_routes_read_from_the_replica(client_for):
+    client, user_id = client_for('reader')
+    with app.app_context():
+        db.session.add(WasteEntry(user_id=user_id, waste_type='organic', description='not replicated yet'))
+        db.session.commit()
+
+    assert api_descriptions(client) == []
+    replicate()
+    assert api_descriptions(client) == ['not replicated yet']
+
+
+def test_writes_go_to_the_primary_and_reads_stick_to_it(client_for, monkeypatch):
+    client, user_id = client_for('writer')
+
+    response = client.post('/api/waste-entries', json={'waste_type': 'organic', 'description': 'mine'})
+    assert response.status_code == 201
+    assert 'Set-Cookie' in response.headers  # last_write_at recorded
+    assert entry_descriptions(PRIMARY_PATH, user_id) == ['mine']
+    assert entry_descriptions(REPLICA_PATH, user_id) == []
+
+    # Within the sticky window the writer reads their own write from the primary
+    assert api_descriptions(client) == ['mine']
+
+    # Once the window has passed, reads go back to the (lagging) replica
+    monkeypatch.setitem(app.config, 'REPLICA_STICKY_SECONDS', 0)
+    assert api_descriptions(client) == []
+
+
+def test_routes_without_the_decorator_read_from_the_primary(client_for):
+    client, user_id = client_for('tracker')
+    with app.app_context():
+        db.session.add(WasteEntry(user_id=user_id, waste_type='organic', description='on primary'))
+        db.session.commit()
+
+    assert b'on primary' in client.get('/track-waste').data
+
+
+def test_no_sticky_cookie_without_a_replica(client_for, monkeypatch):
+    client, _ = client_for('solo')
+    monkeypatch.setitem(app.config, 'SQLALCHEMY_BINDS', {})
+
+    response = client.post('/api/waste-entries', json={'waste_type': 'organic', 'description': 'write'})
+    assert response.status_code == 201
+    assert 'Set-Cookie' not in response.headers
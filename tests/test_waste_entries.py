@@ -0,0 +1,61 @@
+import sqlite3
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+
+from conftest import PRIMARY_PATH
+from app import UserWasteCounter, WasteEntry, app
+
+
+def logged_in_client(make_user, username):
+    user_id = make_user(username)
+    client = app.test_client()
+    client.post('/login', data={'username': username, 'password': 'secret'})
+    return client, user_id
+
+
+def counter(database, user_id):
+    with app.app_context():
+        row = database.session.get(UserWasteCounter, user_id)
+        return (row.entry_count, row.total_weight, row.recycled_count) if row else (0, 0.0, 0)
+
+
+def test_api_accepts_numeric_string_weights(database, make_user):
+    client, user_id = logged_in_client(make_user, 'stringly')
+    response = client.post('/api/waste-entries', json={'waste_type': 'organic', 'weight_kg': '5'})
+    assert response.status_code == 201
+    assert counter(database, user_id) == (1, 5.0, 0)
+
+
+def test_api_rejects_invalid_weights(database, make_user):
+    client, user_id = logged_in_client(make_user, 'weightless')
+    for weight in ('NaN', 'Infinity', '-1', '"heavy"', 'true', '[1]'):
+        response = client.post('/api/waste-entries', data=f'{{"waste_type": "organic", "weight_kg": {weight}}}',
+                               content_type='application/json')
+        assert response.status_code == 400, weight
+    assert counter(database, user_id) == (0, 0.0, 0)
+
+
+def test_toggle_recycled_applies_its_delta_once(database, make_user):
+    client, user_id = logged_in_client(make_user, 'toggler')
+    entry_id = client.post('/api/waste-entries', json={'waste_type': 'organic', 'weight_kg': 2}).get_json()['id']
+
+    client.post(f'/toggle-recycled/{entry_id}')
+    assert counter(database, user_id) == (1, 2.0, 1)
+
+    # Another request flips the entry between this one reading it and updating it
+    def concurrent_toggle(orm_execute_state):
+        if orm_execute_state.is_update:
+            with sqlite3.connect(PRIMARY_PATH) as connection:
+                connection.execute('UPDATE waste_entry SET recycled = NOT recycled WHERE id = ?', (entry_id,))
+
+    event.listen(OrmSession, 'do_orm_execute', concurrent_toggle)
+    try:
+        client.post(f'/toggle-recycled/{entry_id}')
+    finally:
+        event.remove(OrmSession, 'do_orm_execute', concurrent_toggle)
+
+    # The conditional update matched nothing, so the rollups keep the first toggle only
+    with app.app_context():
+        assert database.session.get(WasteEntry, entry_id).recycled is False
+    assert counter(database, user_id) == (1, 2.0, 1)